@@ -22,4 +22,61 @@ class Settings(BaseSettings):
     # Optional proxy for OLA Maps API (if carrier blocks)
     OLA_MAPS_PROXY: Optional[str] = None
 
+    # --- WebSocket scaling ---
+    # Cross-worker backplane: "" (single worker), "postgres" or "unix"
+    WS_BACKPLANE: str = ""
+    WS_BACKPLANE_SOCKET: str = "/tmp/tripsync-ws.sock"
+    WS_BACKPLANE_FLUSH_MS: int = 5
+    # Workers announce themselves this often; silent for 3x this, a worker's users are re-routed
+    WS_BACKPLANE_LIVENESS_SECONDS: float = 5
+    # Coalesce events per socket for this long (0 disables coalescing)
+    WS_COALESCE_MS: int = 0
+    # Server heartbeat: ping sockets idle this long, reap them if no reply (0 disables)
+    WS_HEARTBEAT_INTERVAL_SECONDS: int = 25
+    WS_HEARTBEAT_TIMEOUT_SECONDS: int = 10
+    # Inbound limits per user: token-bucket rate, max frame size and what to do on violation
+    WS_INBOUND_RATE_PER_SECOND: float = 10
+    WS_INBOUND_BURST: int = 20
+    WS_MAX_FRAME_BYTES: int = 16384
+    WS_RATE_LIMIT_ACTION: str = "drop"  # drop | throttle | close
+    # Events kept per user for replay on reconnect, and how many users to keep them for
+    WS_EVENT_LOG_SIZE: int = 100
+    WS_EVENT_LOG_MAX_USERS: int = 10000
+    # Chat messages sent over the socket are committed in batches this often / this large
+    WS_CHAT_FLUSH_MS: int = 20
+    WS_CHAT_MAX_BATCH: int = 500
+
+    # --- Message archival ---
+    # Messages older than this move to messages_archive (0 disables the archiver)
+    MESSAGE_HOT_DAYS: int = 180
+    MESSAGE_ARCHIVE_INTERVAL_MINUTES: int = 60
+    MESSAGE_ARCHIVE_BATCH_SIZE: int = 5000
+
+    # --- Service posts ---
+    # The in-memory tag index is rebuilt from the database at least this often
+    SERVICE_TAG_INDEX_MAX_AGE_SECONDS: int = 60
+    # Cached feed pages per worker (0 disables the cache) and how long they live
+    SERVICE_FEED_CACHE_SIZE: int = 1000
+    SERVICE_FEED_CACHE_TTL_SECONDS: int = 30
+
+    # --- Lifecycle scheduler ---
+    # How often expired service posts and timed-out pooling requests are cancelled (0 disables it)
+    LIFECYCLE_INTERVAL_SECONDS: int = 60
+    LIFECYCLE_BATCH_SIZE: int = 1000
+    # ACTIVE / MATCHED pooling requests older than this are cancelled
+    POOLING_REQUEST_TIMEOUT_MINUTES: int = 15
+
+    # --- Password hashing ---
+    # bcrypt worker processes per API worker (0 hashes inline), calls allowed to
+    # wait for one before new ones get a 503, and how long a caller waits
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10
+
+    # --- Authentication ---
+    # Authenticated users (and decoded tokens) cached per worker (0 disables the
+    # cache), and how long a cached user is trusted
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
 settings = Settings()
\ No newline at end of file
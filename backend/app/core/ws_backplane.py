@@ -0,0 +1,378 @@
+# backend/app/core/ws_backplane.py
+
+import abc
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Target used when we don't know which worker owns a user's socket.
+BROADCAST = "*"
+
+# NOTIFY payloads are capped at 8000 bytes by Postgres; leave headroom for the envelope.
+PG_MAX_PAYLOAD_BYTES = 7500
+PG_BROADCAST_CHANNEL = "tripsync_ws_all"
+
+DeliverHandler = Callable[[int, dict], Awaitable[bool]]
+
+
+class Backplane(abc.ABC):
+    """
+    Routes WebSocket events between uvicorn workers.
+
+    Every worker keeps its own sockets in the ConnectionManager. When an event is
+    produced for a user whose socket isn't local, the manager hands it to the
+    backplane, which forwards it to the owning worker (or to every worker if the
+    owner is unknown). Publishes are buffered and flushed as one batch per target
+    every `flush_interval` seconds.
+
+    Every worker also broadcasts an `alive` event each `liveness_interval`
+    seconds. A worker not heard from for three intervals is presumed dead (e.g.
+    it crashed without announcing its users leaving): its users' locations are
+    dropped and events for them are broadcast until they reconnect somewhere.
+
+    Subclasses only implement the transport: `_open`, `_close` and `_send`.
+    """
+
+    def __init__(self, flush_interval: float = 0.005, max_batch: int = 200, liveness_interval: float = 5):
+        self.worker_id = f"{os.getpid()}{uuid.uuid4().hex[:8]}"
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.liveness_interval = liveness_interval
+
+        # user_id -> worker_id that currently holds the user's socket
+        self.locations: Dict[int, str] = {}
+        # worker_id -> monotonic time we last received anything from it
+        self.last_heard: Dict[str, float] = {}
+        self._alive_task: Optional[asyncio.Task] = None
+
+        self._outbox: Dict[str, List[dict]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._deliver: Optional[DeliverHandler] = None
+        self.stats = {
+            "published_events": 0,
+            "published_batches": 0,
+            "received_events": 0,
+            "undeliverable_events": 0,
+            "stale_locations": 0,
+        }
+
+    # ---------- Lifecycle ----------
+
+    async def start(self, deliver: DeliverHandler):
+        """Opens the transport. `deliver` is called for events addressed to local users."""
+        self._deliver = deliver
+        await self._open()
+        if self.liveness_interval > 0:
+            self._alive_task = asyncio.get_running_loop().create_task(self._announce_alive())
+        logger.info(f"WebSocket backplane {type(self).__name__} started as worker {self.worker_id}")
+
+    async def stop(self):
+        """Flushes anything still buffered and closes the transport."""
+        if self._alive_task:
+            self._alive_task.cancel()
+            self._alive_task = None
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self._flush_now()
+        await self._close()
+
+    # ---------- Publishing ----------
+
+    def announce(self, user_id: int, present: bool):
+        """Tells the other workers that a user's socket connected to / left this worker."""
+        self._enqueue(BROADCAST, {"op": "presence", "user_id": user_id, "present": present})
+
+    def publish(self, user_id: int, message: dict):
+        """Queues a message for a user whose socket lives in another worker."""
+        target = self.locations.get(user_id, BROADCAST)
+        if target != BROADCAST and not self._is_alive(target):
+            # The owner went quiet; whoever holds the user now will pick it up
+            del self.locations[user_id]
+            self.stats["stale_locations"] += 1
+            target = BROADCAST
+        self._enqueue(target, {"op": "deliver", "user_id": user_id, "message": message})
+
+    def _is_alive(self, worker_id: str) -> bool:
+        if self.liveness_interval <= 0:
+            return True
+        heard = self.last_heard.get(worker_id)
+        return heard is not None and time.monotonic() - heard < 3 * self.liveness_interval
+
+    async def _announce_alive(self):
+        while True:
+            self._enqueue(BROADCAST, {"op": "alive"})
+            await asyncio.sleep(self.liveness_interval)
+
+    def _enqueue(self, target: str, event: dict):
+        batch = self._outbox.setdefault(target, [])
+        batch.append(event)
+        self.stats["published_events"] += 1
+
+        if len(batch) >= self.max_batch:
+            asyncio.get_running_loop().create_task(self._flush_target(target))
+        elif self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.flush_interval)
+        finally:
+            self._flush_task = None
+        await self._flush_now()
+
+    async def _flush_now(self):
+        for target in list(self._outbox):
+            await self._flush_target(target)
+
+    async def _flush_target(self, target: str):
+        events = self._outbox.pop(target, None)
+        if not events:
+            return
+        try:
+            await self._send(target, {"from": self.worker_id, "events": events})
+            self.stats["published_batches"] += 1
+        except Exception as e:
+            logger.error(f"Backplane publish to {target} failed ({len(events)} events): {e}")
+
+    # ---------- Receiving ----------
+
+    async def _handle_batch(self, batch: dict):
+        """Applies a batch received from the transport."""
+        origin = batch.get("from")
+        if origin == self.worker_id:
+            return
+        self.last_heard[origin] = time.monotonic()
+
+        for event in batch.get("events", []):
+            self.stats["received_events"] += 1
+            user_id = event.get("user_id")
+
+            if event.get("op") == "presence":
+                if event.get("present"):
+                    self.locations[user_id] = origin
+                elif self.locations.get(user_id) == origin:
+                    del self.locations[user_id]
+
+            elif event.get("op") == "deliver" and self._deliver:
+                delivered = await self._deliver(user_id, event.get("message"))
+                if not delivered:
+                    self.stats["undeliverable_events"] += 1
+
+    # ---------- Transport hooks ----------
+
+    async def _open(self):
+        pass
+
+    async def _close(self):
+        pass
+
+    @abc.abstractmethod
+    async def _send(self, target: str, batch: dict):
+        ...
+
+
+class PostgresBackplane(Backplane):
+    """
+    Backplane on Postgres LISTEN/NOTIFY, so multi-worker deployments need nothing
+    beyond the database we already run. Each worker listens on its own channel
+    plus a shared broadcast channel.
+    """
+
+    def __init__(self, database_url: str, **kwargs):
+        super().__init__(**kwargs)
+        from sqlalchemy.engine import make_url
+
+        # psycopg2 doesn't understand SQLAlchemy's "postgresql+driver" scheme.
+        url = make_url(database_url).set(drivername="postgresql")
+        self._dsn = url.render_as_string(hide_password=False)
+        self._listen_conn = None
+        self._notify_conn = None
+
+    def _channel(self, target: str) -> str:
+        return PG_BROADCAST_CHANNEL if target == BROADCAST else f"tripsync_ws_{target}"
+
+    async def _open(self):
+        import psycopg2
+
+        self._listen_conn = psycopg2.connect(self._dsn)
+        self._listen_conn.autocommit = True
+        self._notify_conn = psycopg2.connect(self._dsn)
+        self._notify_conn.autocommit = True
+
+        with self._listen_conn.cursor() as cur:
+            cur.execute(f'LISTEN "{PG_BROADCAST_CHANNEL}"')
+            cur.execute(f'LISTEN "{self._channel(self.worker_id)}"')
+
+        asyncio.get_running_loop().add_reader(self._listen_conn.fileno(), self._on_readable)
+
+    async def _close(self):
+        if self._listen_conn:
+            asyncio.get_running_loop().remove_reader(self._listen_conn.fileno())
+            self._listen_conn.close()
+            self._listen_conn = None
+        if self._notify_conn:
+            self._notify_conn.close()
+            self._notify_conn = None
+
+    def _on_readable(self):
+        self._listen_conn.poll()
+        while self._listen_conn.notifies:
+            notify = self._listen_conn.notifies.pop(0)
+            try:
+                batch = json.loads(notify.payload)
+            except json.JSONDecodeError:
+                logger.error(f"Dropping malformed backplane payload on {notify.channel}")
+                continue
+            asyncio.get_running_loop().create_task(self._handle_batch(batch))
+
+    async def _send(self, target: str, batch: dict):
+        payloads = self._split(batch)
+        channel = self._channel(target)
+        await asyncio.get_running_loop().run_in_executor(None, self._notify_sync, channel, payloads)
+
+    def _split(self, batch: dict) -> List[str]:
+        """Splits a batch into NOTIFY-sized payloads."""
+        payloads, chunk = [], []
+        for event in batch["events"]:
+            candidate = json.dumps({"from": batch["from"], "events": chunk + [event]}, default=str)
+            if chunk and len(candidate.encode("utf-8")) > PG_MAX_PAYLOAD_BYTES:
+                payloads.append(json.dumps({"from": batch["from"], "events": chunk}, default=str))
+                chunk = [event]
+            else:
+                chunk.append(event)
+        if chunk:
+            payloads.append(json.dumps({"from": batch["from"], "events": chunk}, default=str))
+        return payloads
+
+    def _notify_sync(self, channel: str, payloads: List[str]):
+        with self._notify_conn.cursor() as cur:
+            for payload in payloads:
+                cur.execute("SELECT pg_notify(%s, %s)", (channel, payload))
+
+
+class UnixSocketBackplane(Backplane):
+    """
+    Backplane that talks to a local `UnixSocketBroker` over newline-delimited JSON.
+    Meant for tests and single-host setups without a Postgres to LISTEN on.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+
+    async def _open(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._writer.write(json.dumps({"op": "hello", "worker": self.worker_id}).encode() + b"\n")
+        await self._writer.drain()
+        self._read_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    async def _close(self):
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    async def _read_loop(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                logger.error("WebSocket backplane broker closed the connection")
+                return
+            await self._handle_batch(json.loads(line))
+
+    async def _send(self, target: str, batch: dict):
+        frame = {"to": target, "batch": batch}
+        self._writer.write(json.dumps(frame, default=str).encode() + b"\n")
+        await self._writer.drain()
+
+
+class UnixSocketBroker:
+    """
+    Minimal fan-out broker for `UnixSocketBackplane`.
+    Run it with `python -m app.core.ws_backplane /tmp/tripsync-ws.sock`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.workers: Dict[str, asyncio.StreamWriter] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle_worker, path=self.path)
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self.workers.values():
+            writer.close()
+        self.workers.clear()
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        hello = json.loads(await reader.readline())
+        worker_id = hello["worker"]
+        self.workers[worker_id] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                frame = json.loads(line)
+                data = json.dumps(frame["batch"]).encode() + b"\n"
+
+                if frame["to"] == BROADCAST:
+                    targets = [w for wid, w in self.workers.items() if wid != worker_id]
+                else:
+                    targets = [self.workers[frame["to"]]] if frame["to"] in self.workers else []
+
+                for target in targets:
+                    target.write(data)
+                    await target.drain()
+        finally:
+            self.workers.pop(worker_id, None)
+            writer.close()
+
+
+def create_backplane() -> Optional[Backplane]:
+    """Builds the backplane selected by WS_BACKPLANE, or None for single-worker mode."""
+    kind = settings.WS_BACKPLANE.lower()
+    options = {
+        "flush_interval": settings.WS_BACKPLANE_FLUSH_MS / 1000,
+        "liveness_interval": settings.WS_BACKPLANE_LIVENESS_SECONDS,
+    }
+
+    if not kind:
+        return None
+    if kind == "postgres":
+        return PostgresBackplane(settings.DATABASE_URL, **options)
+    if kind == "unix":
+        return UnixSocketBackplane(settings.WS_BACKPLANE_SOCKET, **options)
+    raise ValueError(f"Unknown WS_BACKPLANE '{settings.WS_BACKPLANE}'. Use 'postgres' or 'unix'.")
+
+
+if __name__ == "__main__":
+    import sys
+
+    async def _serve(path: str):
+        broker = UnixSocketBroker(path)
+        await broker.start()
+        print(f"WebSocket backplane broker listening on {path}")
+        await asyncio.Event().wait()
+
+    asyncio.run(_serve(sys.argv[1] if len(sys.argv) > 1 else settings.WS_BACKPLANE_SOCKET))
@@ -0,0 +1,81 @@
+# backend/app/core/ws_eventlog.py
+
+import os
+import uuid
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class EventLog:
+    """
+    Bounded per-user buffer of the events sent through the ConnectionManager.
+
+    Every event gets a `seq` number that only ever increases, and the `log_id`
+    of the log that numbered it. Sequence numbers are only comparable within one
+    log: each worker process has its own, and a restart starts a new one. A
+    client that reconnects with the last `log_id` and `seq` it saw gets just the
+    events it missed. If the buffer no longer reaches back that far, or the
+    client's events were numbered by another log, the client is told to resync
+    over REST instead.
+    """
+
+    def __init__(self, per_user: int = 100, max_users: int = 10000):
+        self.per_user = per_user
+        self.max_users = max_users
+
+        self.log_id = f"{os.getpid()}{uuid.uuid4().hex[:8]}"
+        # The seq of the newest event numbered by this log
+        self.last_seq = 0
+        # A last_seq below the floor can't be replayed for any user.
+        self.floor = 0
+
+        self._logs: "OrderedDict[int, Deque[dict]]" = OrderedDict()
+        # user_id -> highest seq pushed out of that user's buffer
+        self._truncated_through: Dict[int, int] = {}
+
+    def append(self, user_id: int, message: dict) -> dict:
+        """
+        Stamps `message` with this log's id and next sequence number, replacing
+        any stamp from another worker, and records it.
+        """
+        self.last_seq += 1
+        event = {**message, "log_id": self.log_id, "seq": self.last_seq}
+
+        log = self._logs.get(user_id)
+        if log is None:
+            log = self._logs[user_id] = deque(maxlen=self.per_user)
+        else:
+            self._logs.move_to_end(user_id)
+        if len(log) == log.maxlen:
+            self._truncated_through[user_id] = log[0]["seq"]
+        log.append(event)
+
+        while len(self._logs) > self.max_users:
+            evicted_user, evicted_log = self._logs.popitem(last=False)
+            self._truncated_through.pop(evicted_user, None)
+            # We no longer know what that user missed, so raise the global floor.
+            self.floor = max(self.floor, evicted_log[-1]["seq"])
+
+        return event
+
+    def since(self, user_id: int, last_seq: int, log_id: Optional[str]) -> Tuple[List[dict], bool]:
+        """
+        Returns (events after last_seq, complete). `complete` is False when some
+        of the events the client missed have already been dropped, or when
+        `log_id` is another log's, in which case nothing is returned.
+        """
+        if log_id != self.log_id:
+            return [], False
+        complete = last_seq >= self.floor and last_seq >= self._truncated_through.get(user_id, 0)
+        log = self._logs.get(user_id)
+        if not log:
+            return [], complete
+        return [event for event in log if event["seq"] > last_seq], complete
+
+    def stats(self) -> dict:
+        return {
+            "log_id": self.log_id,
+            "users": len(self._logs),
+            "events": sum(len(log) for log in self._logs.values()),
+            "per_user": self.per_user,
+        }
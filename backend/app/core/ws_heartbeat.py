@@ -0,0 +1,144 @@
+# backend/app/core/ws_heartbeat.py
+
+import asyncio
+import math
+import time
+from typing import Dict, Hashable, List, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.core.ws_manager import ConnectionManager
+
+# (user_id, channel), as in ConnectionManager
+SocketKey = Tuple[int, str]
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel. Scheduling, rescheduling and cancelling are O(1), and
+    each tick only looks at one bucket, so tens of thousands of sockets cost
+    almost nothing between deadlines.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 64):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self.current_tick = 0
+        self._buckets: List[Set[Hashable]] = [set() for _ in range(slots)]
+        # key -> absolute tick at which it expires
+        self._deadlines: Dict[Hashable, int] = {}
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, key: Hashable, delay_seconds: float):
+        """(Re)schedules `key` to expire after `delay_seconds`."""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay_seconds / self.tick_seconds))
+        deadline = self.current_tick + ticks
+        self._deadlines[key] = deadline
+        self._buckets[deadline % self.slots].add(key)
+
+    def cancel(self, key: Hashable):
+        deadline = self._deadlines.pop(key, None)
+        if deadline is not None:
+            self._buckets[deadline % self.slots].discard(key)
+
+    def advance(self) -> List[Hashable]:
+        """Moves the wheel one tick forward and returns the keys that expired."""
+        self.current_tick += 1
+        bucket = self._buckets[self.current_tick % self.slots]
+        # Keys whose deadline is further than one revolution away stay in the bucket.
+        expired = [key for key in bucket if self._deadlines[key] <= self.current_tick]
+        for key in expired:
+            bucket.discard(key)
+            del self._deadlines[key]
+        return expired
+
+
+class HeartbeatMonitor:
+    """
+    Server-driven liveness for the sockets held by a ConnectionManager. Each
+    socket is tracked separately by its (user_id, channel) key.
+
+    A socket that has been silent for `interval` seconds is sent a `ping` frame.
+    Any inbound frame (normally the client's `pong`) counts as proof of life. If
+    nothing arrives within `timeout` seconds the socket is reaped.
+    """
+
+    def __init__(self, manager: "ConnectionManager", interval: float, timeout: float, tick_seconds: float = 1.0):
+        self.manager = manager
+        self.interval = interval
+        self.timeout = timeout
+        self.wheel = TimerWheel(
+            tick_seconds=tick_seconds,
+            slots=max(8, math.ceil(max(interval, timeout) / tick_seconds) + 1),
+        )
+        # socket key -> monotonic time the ping was sent
+        self.awaiting_pong: Dict[SocketKey, float] = {}
+        self.pings_sent = 0
+        self._task: asyncio.Task | None = None
+        self._checks: Set[asyncio.Task] = set()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._checks):
+            task.cancel()
+
+    def track(self, key: SocketKey):
+        self.awaiting_pong.pop(key, None)
+        self.wheel.schedule(key, self.interval)
+
+    def untrack(self, key: SocketKey):
+        self.awaiting_pong.pop(key, None)
+        self.wheel.cancel(key)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.wheel.tick_seconds)
+            keys = self.wheel.advance()
+            if keys:
+                # In the background and concurrently, so one slow socket holds up
+                # neither the rest of its slot nor the next tick
+                task = asyncio.get_running_loop().create_task(self._check_all(keys))
+                self._checks.add(task)
+                task.add_done_callback(self._checks.discard)
+
+    async def _check_all(self, keys: List[SocketKey]):
+        await asyncio.gather(*(self._check(key) for key in keys), return_exceptions=True)
+
+    async def _check(self, key: SocketKey):
+        if self.manager.socket_for(key) is None:
+            self.awaiting_pong.pop(key, None)
+            return
+
+        now = time.monotonic()
+        last_seen = self.manager.last_seen.get(key, 0)
+        ping_sent_at = self.awaiting_pong.pop(key, None)
+
+        if ping_sent_at is not None and last_seen < ping_sent_at:
+            await self.manager.reap(key)
+            return
+
+        # Activity is recorded lazily with a timestamp, so a busy socket is only
+        # rescheduled here instead of on every inbound frame.
+        idle = now - last_seen
+        if idle < self.interval:
+            self.wheel.schedule(key, self.interval - idle)
+            return
+
+        self.awaiting_pong[key] = now
+        self.pings_sent += 1
+        self.wheel.schedule(key, self.timeout)
+        user_id, channel = key
+        try:
+            # A socket whose send stalls is reaped when its pong deadline comes up
+            await asyncio.wait_for(
+                self.manager.deliver_local(user_id, {"type": "ping"}, channel=channel), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            pass
@@ -1,32 +1,374 @@
 # backend/app/core/ws_manager.py
 
+import asyncio
+import time
 from fastapi import WebSocket
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.ws_backplane import Backplane
+from app.core.ws_eventlog import EventLog
+from app.core.ws_heartbeat import HeartbeatMonitor
+from app.core.ws_ratelimit import InboundLimiter
+
+# Events describing the current state of a pooling connection. When several are
+# queued for the same connection_id, only the latest one matters to the client.
+CONNECTION_STATE_EVENTS = {
+    "connection_request_received",
+    "connection_request_sent",
+    "connection_approved",
+    "connection_rejected",
+}
+
+# Each socket is opened for one channel: /ws/pool or /ws/chat. A user can hold one
+# socket per channel, and an event only goes to the sockets whose handler knows
+# it. Pool sockets handle every event (including partner chat); chat sockets only
+# chat messages. Control frames (ping, resync_required) are sent to one socket.
+POOL_CHANNEL = "pool"
+CHAT_CHANNEL = "chat"
+CHANNEL_EVENTS = {
+    POOL_CHANNEL: None,  # all events
+    CHAT_CHANNEL: {"chat_message"},
+}
+
+def _handles(channel: str, message: dict) -> bool:
+    events = CHANNEL_EVENTS.get(channel)
+    return events is None or message.get("type") in events
+
+# A socket is identified by (user_id, channel)
+SocketKey = Tuple[int, str]
+
+def _coalesce_key(message: dict):
+    """Returns the key under which a queued event supersedes older ones, or None."""
+    msg_type = message.get("type")
+    if msg_type in CONNECTION_STATE_EVENTS and message.get("connection_id") is not None:
+        return ("connection", message["connection_id"])
+    if msg_type == "match_found" and message.get("match"):
+        return ("match", message["match"].get("request_id"))
+    return None
 
 class ConnectionManager:
     def __init__(self):
-        # This dictionary will hold the active connections
-        # The key will be the user's ID (integer)
-        self.active_connections: Dict[int, WebSocket] = {}
+        # This dictionary will hold the active connections:
+        # user id -> channel -> that user's socket on the channel
+        self.active_connections: Dict[int, Dict[str, WebSocket]] = {}
+
+        # Liveness bookkeeping per socket (monotonic timestamps), used by the heartbeat reaper.
+        self.connected_at: Dict[SocketKey, float] = {}
+        self.last_seen: Dict[SocketKey, float] = {}
+        self.heartbeat: Optional[HeartbeatMonitor] = None
+        self.reaped_total = 0
+        self.failed_sends = 0
+
+        # Recent events per user, so a reconnecting client can catch up on what it missed.
+        self.event_log = EventLog(
+            per_user=settings.WS_EVENT_LOG_SIZE,
+            max_users=settings.WS_EVENT_LOG_MAX_USERS,
+        )
+
+        # Limits on frames received from clients. Socket handlers call
+        # `await manager.inbound.admit(...)` for every frame before processing it.
+        self.inbound = InboundLimiter(
+            rate=settings.WS_INBOUND_RATE_PER_SECOND,
+            burst=settings.WS_INBOUND_BURST,
+            max_frame_bytes=settings.WS_MAX_FRAME_BYTES,
+            action=settings.WS_RATE_LIMIT_ACTION,
+        )
 
-    async def connect(self, user_id: int, websocket: WebSocket):
-        """Accepts a new WebSocket connection and stores it."""
+        # Optional cross-worker backplane. When set, messages for users whose
+        # socket lives in another worker are forwarded through it.
+        self.backplane: Optional[Backplane] = None
+
+        # Optional per-socket coalescing. Events queued for the same user within
+        # `coalesce_interval` seconds go out as one JSON array frame.
+        self.coalesce_interval = settings.WS_COALESCE_MS / 1000
+        self._pending: Dict[SocketKey, Dict[object, dict]] = {}
+        self._pending_seq = 0
+        self._flush_tasks: Dict[SocketKey, asyncio.Task] = {}
+
+        # Sockets still being replayed to by resume(): live events for them are
+        # held here and sent after the replay, minus any it already covered.
+        self._replaying: Dict[SocketKey, List[dict]] = {}
+
+    async def start_backplane(self, backplane: Backplane):
+        """Attaches a backplane and announces any sockets already connected here."""
+        self.backplane = backplane
+        await backplane.start(self._deliver_forwarded)
+        for user_id in self.active_connections:
+            backplane.announce(user_id, present=True)
+
+    async def stop_backplane(self):
+        if self.backplane:
+            await self.backplane.stop()
+            self.backplane = None
+
+    def start_heartbeat(self, interval: float, timeout: float):
+        """Starts pinging idle sockets and reaping the ones that stop answering."""
+        self.heartbeat = HeartbeatMonitor(self, interval=interval, timeout=timeout)
+        for key in self.connected_at:
+            self.heartbeat.track(key)
+        self.heartbeat.start()
+
+    async def stop_heartbeat(self):
+        if self.heartbeat:
+            await self.heartbeat.stop()
+            self.heartbeat = None
+
+    def socket_for(self, key: SocketKey) -> Optional[WebSocket]:
+        user_id, channel = key
+        return self.active_connections.get(user_id, {}).get(channel)
+
+    async def connect(
+        self,
+        user_id: int,
+        websocket: WebSocket,
+        channel: str = POOL_CHANNEL,
+        last_seq: Optional[int] = None,
+        log_id: Optional[str] = None,
+    ):
+        """
+        Accepts a new WebSocket connection and stores it. A newer socket on the
+        same channel replaces the user's previous one; other channels are kept.
+        With `last_seq`, the events the client missed are replayed (see resume()).
+        """
         await websocket.accept()
-        self.active_connections[user_id] = websocket
-        print(f"User {user_id} connected via WebSocket.")
+        sockets = self.active_connections.setdefault(user_id, {})
+        first = not sockets
+        sockets[channel] = websocket
+        key = (user_id, channel)
+        self._replaying.pop(key, None)
+        now = time.monotonic()
+        self.connected_at[key] = now
+        self.last_seen[key] = now
+        if self.heartbeat:
+            self.heartbeat.track(key)
+        if self.backplane and first:
+            self.backplane.announce(user_id, present=True)
+        print(f"User {user_id} connected via WebSocket ({channel}).")
+        if last_seq is not None:
+            await self.resume(user_id, last_seq, log_id, channel)
+
+    def _channel_of(self, user_id: int, websocket: WebSocket) -> Optional[str]:
+        for channel, socket in self.active_connections.get(user_id, {}).items():
+            if socket is websocket:
+                return channel
+        return None
 
-    def disconnect(self, user_id: int):
-        """Removes a WebSocket connection."""
-        if user_id in self.active_connections:
+    def disconnect(self, user_id: int, websocket: Optional[WebSocket] = None):
+        """
+        Removes a WebSocket connection.
+        If `websocket` is given, only that socket is removed, and nothing happens
+        unless it is still current on its channel, so a stale handler can't drop
+        a newer connection. Without it, all of the user's sockets are removed.
+        """
+        if websocket is None:
+            channels = list(self.active_connections.get(user_id, {}))
+        else:
+            channel = self._channel_of(user_id, websocket)
+            channels = [channel] if channel else []
+        for channel in channels:
+            self._remove(user_id, channel)
+
+    def _remove(self, user_id: int, channel: str):
+        sockets = self.active_connections.get(user_id)
+        if not sockets or channel not in sockets:
+            return
+        del sockets[channel]
+        key = (user_id, channel)
+        self.connected_at.pop(key, None)
+        self.last_seen.pop(key, None)
+        if self.heartbeat:
+            self.heartbeat.untrack(key)
+        self._pending.pop(key, None)
+        self._replaying.pop(key, None)
+        flush_task = self._flush_tasks.pop(key, None)
+        if flush_task:
+            flush_task.cancel()
+        if not sockets:
             del self.active_connections[user_id]
-            print(f"User {user_id} disconnected from WebSocket.")
+            self.inbound.forget(user_id)
+            if self.backplane:
+                self.backplane.announce(user_id, present=False)
+        print(f"User {user_id} disconnected from WebSocket ({channel}).")
 
-    async def send_personal_message(self, message: dict, user_id: int):
-        """Sends a JSON message to a specific user."""
-        if user_id in self.active_connections:
-            websocket = self.active_connections[user_id]
+    def touch(self, user_id: int, websocket: WebSocket):
+        """Records inbound activity on a user's socket. Call it for every received frame."""
+        channel = self._channel_of(user_id, websocket)
+        if channel:
+            self.last_seen[(user_id, channel)] = time.monotonic()
+
+    async def reap(self, key: SocketKey):
+        """Closes and forgets a socket that stopped responding."""
+        websocket = self.socket_for(key)
+        if websocket is None:
+            return
+        user_id, channel = key
+        self._remove(user_id, channel)
+        self.reaped_total += 1
+        print(f"Reaped unresponsive WebSocket for user {user_id} ({channel}).")
+        try:
+            await asyncio.wait_for(websocket.close(code=1001), timeout=1.0)
+        except Exception:
+            pass
+
+    async def deliver_local(self, user_id: int, message: dict, channel: Optional[str] = None) -> bool:
+        """
+        Sends a message to the sockets held by this worker that handle it, or
+        only to the one on `channel` if given. Returns False if there is none,
+        or if every send failed (dead sockets are reaped in that case).
+        """
+        sockets = self.active_connections.get(user_id, {})
+        if channel is not None:
+            channels = [channel] if channel in sockets else []
+        else:
+            channels = [name for name in sockets if _handles(name, message)]
+        delivered = False
+        for name in channels:
+            held = self._replaying.get((user_id, name))
+            if held is not None:
+                held.append(message)
+                delivered = True
+            elif await self._send((user_id, name), message):
+                delivered = True
+        return delivered
+
+    async def _deliver_forwarded(self, user_id: int, message: dict) -> bool:
+        """
+        Handles an event forwarded by another worker. It is logged here too, so
+        it can be replayed to the user's socket on this worker; that renumbers
+        it in this worker's log.
+        """
+        return await self.deliver_local(user_id, self.event_log.append(user_id, message))
+
+    async def _send(self, key: SocketKey, message: dict) -> bool:
+        if self.coalesce_interval > 0:
+            self._queue(key, message)
+            return True
+        websocket = self.socket_for(key)
+        if websocket is None:
+            return False
+        try:
             await websocket.send_json(message)
-            print(f"Sent message to user {user_id}: {message}")
+        except Exception as e:
+            print(f"Failed to send to user {key[0]} ({key[1]}): {e}")
+            self.failed_sends += 1
+            await self.reap(key)
+            return False
+        print(f"Sent message to user {key[0]} ({key[1]}): {message}")
+        return True
+
+    def _queue(self, key: SocketKey, message: dict):
+        """Queues a message for the next flush, replacing any event it supersedes."""
+        pending = self._pending.setdefault(key, {})
+        slot = _coalesce_key(message)
+        if slot is None:
+            self._pending_seq += 1
+            slot = self._pending_seq
+        # Pop first so a superseding event takes the newest position in the frame.
+        pending.pop(slot, None)
+        pending[slot] = message
+
+        if key not in self._flush_tasks:
+            self._flush_tasks[key] = asyncio.get_running_loop().create_task(self._flush(key))
+
+    async def _flush(self, key: SocketKey):
+        await asyncio.sleep(self.coalesce_interval)
+        self._flush_tasks.pop(key, None)
+        messages = list(self._pending.pop(key, {}).values())
+        websocket = self.socket_for(key)
+        if not messages or not websocket:
+            return
+
+        # A single event keeps the plain object frame existing clients expect.
+        frame = messages[0] if len(messages) == 1 else messages
+        try:
+            await websocket.send_json(frame)
+            print(f"Sent {len(messages)} message(s) to user {key[0]} ({key[1]})")
+        except Exception as e:
+            print(f"Failed to send to user {key[0]} ({key[1]}): {e}")
+            self.failed_sends += 1
+            await self.reap(key)
+
+    def stats(self) -> dict:
+        """Connection counts, reaper activity and connection ages for monitoring."""
+        now = time.monotonic()
+        ages = [now - t for t in self.connected_at.values()]
+        age_buckets = {"under_1m": 0, "1m_to_10m": 0, "10m_to_1h": 0, "over_1h": 0}
+        for age in ages:
+            if age < 60:
+                age_buckets["under_1m"] += 1
+            elif age < 600:
+                age_buckets["1m_to_10m"] += 1
+            elif age < 3600:
+                age_buckets["10m_to_1h"] += 1
+            else:
+                age_buckets["over_1h"] += 1
+
+        return {
+            "active_connections": len(self.connected_at),
+            "connected_users": len(self.active_connections),
+            "reaped_total": self.reaped_total,
+            "failed_sends": self.failed_sends,
+            "pings_sent": self.heartbeat.pings_sent if self.heartbeat else 0,
+            "awaiting_pong": len(self.heartbeat.awaiting_pong) if self.heartbeat else 0,
+            "oldest_connection_age_seconds": round(max(ages), 1) if ages else 0,
+            "connection_ages": age_buckets,
+            "inbound": self.inbound.stats(),
+            "event_log": self.event_log.stats(),
+        }
+
+    async def resume(self, user_id: int, last_seq: int, log_id: Optional[str], channel: str = POOL_CHANNEL):
+        """
+        Replays to the user's socket on `channel` the events it handles that the
+        client missed after `last_seq` of log `log_id`. If some of them are no
+        longer buffered, or were numbered by another worker's log, the client
+        gets a `resync_required` frame and should reload its state over REST.
+
+        Live events that arrive meanwhile are held back and sent after the
+        replay, so the socket gets each seq once and in order.
+        """
+        key = (user_id, channel)
+        # A newer socket on the channel (or a disconnect) replaces or drops this
+        # entry, which ends this replay.
+        held = self._replaying[key] = []
+        events, complete = self.event_log.since(user_id, last_seq, log_id)
+        events = [event for event in events if _handles(channel, event)]
+        replayed = {event["seq"] for event in events}
+        if not complete:
+            # Carries the current position, for the client to resume from after reloading
+            events.insert(0, {
+                "type": "resync_required",
+                "last_seq": last_seq,
+                "log_id": self.event_log.log_id,
+                "seq": self.event_log.last_seq,
+            })
+
+        for event in events:
+            if self._replaying.get(key) is not held:
+                return
+            await self._send(key, event)
+        # New events keep being appended to `held` until it is drained
+        while self._replaying.get(key) is held:
+            if not held:
+                del self._replaying[key]
+                break
+            message = held.pop(0)
+            if message.get("log_id") == self.event_log.log_id and message.get("seq") in replayed:
+                continue
+            await self._send(key, message)
+        print(f"Replayed {len(replayed)} event(s) to user {user_id} after seq {last_seq}.")
+
+    async def send_personal_message(self, message: dict, user_id: int):
+        """
+        Sends a JSON message to a specific user, wherever their socket lives.
+        The message is stamped with a `seq` number and kept in the event log even if
+        the user is offline, so it can be replayed when they reconnect.
+        """
+        message = self.event_log.append(user_id, message)
+        if await self.deliver_local(user_id, message):
+            return
+        if self.backplane:
+            self.backplane.publish(user_id, message)
 
 # Create a single, global instance of the manager that our app can use
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
@@ -0,0 +1,138 @@
+# backend/app/core/ws_ratelimit.py
+
+import asyncio
+import time
+from collections import Counter
+from typing import Dict
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+# What to do with a frame that exceeds the user's rate:
+#   drop     - discard the frame and keep reading
+#   throttle - wait until the bucket refills, which stops us reading from the
+#              socket and pushes back on the client through TCP flow control
+#   close    - close the socket with a policy-violation code
+RATE_LIMIT_ACTIONS = ("drop", "throttle", "close")
+
+
+class TokenBucket:
+    """Classic token bucket: refills at `rate` tokens/second up to `capacity`."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class InboundLimiter:
+    """
+    Per-user limits on frames received over WebSockets: a maximum frame size and
+    a token-bucket message rate. Keeps one misbehaving client from monopolising
+    the event loop every other socket on the worker shares.
+    """
+
+    def __init__(self, rate: float, burst: int, max_frame_bytes: int, action: str = "drop"):
+        if action not in RATE_LIMIT_ACTIONS:
+            raise ValueError(f"Unknown rate limit action '{action}'. Use one of {RATE_LIMIT_ACTIONS}.")
+        self.rate = rate
+        self.burst = burst
+        self.max_frame_bytes = max_frame_bytes
+        self.action = action
+
+        self._buckets: Dict[int, TokenBucket] = {}
+        self.counters = Counter()
+        self.violations_by_user = Counter()
+
+    def forget(self, user_id: int):
+        """Drops a user's state once their last socket closes, so it doesn't grow with every user ever seen."""
+        self._buckets.pop(user_id, None)
+        self.violations_by_user.pop(user_id, None)
+
+    async def admit(self, user_id: int, websocket: WebSocket, data: str) -> bool:
+        """
+        Returns True if the frame should be processed, False if it should be skipped.
+        Raises WebSocketDisconnect after closing the socket when the action is 'close'.
+        """
+        # By now the whole frame has been buffered. The server's ws_max_size
+        # (uvicorn --ws-max-size) is what keeps big frames out of memory; this
+        # only reports the ones that get through when it's set higher.
+        if self._frame_size(data) > self.max_frame_bytes:
+            self.counters["oversized_frames"] += 1
+            await self._violation(user_id, websocket, "frame too large")
+            return False
+
+        if self.rate <= 0:
+            self.counters["admitted"] += 1
+            return True
+
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst)
+
+        if bucket.try_take():
+            self.counters["admitted"] += 1
+            return True
+
+        if self.action == "throttle":
+            self.counters["throttled"] += 1
+            self.violations_by_user[user_id] += 1
+            while not bucket.try_take():
+                wait = bucket.wait_time()
+                self.counters["throttle_wait_ms"] += int(wait * 1000)
+                await asyncio.sleep(wait)
+            self.counters["admitted"] += 1
+            return True
+
+        self.counters["rate_limited"] += 1
+        await self._violation(user_id, websocket, "rate limit exceeded")
+        return False
+
+    def _frame_size(self, data: str) -> int:
+        # A str never takes more than 4 UTF-8 bytes per character, so only encode
+        # when the character count alone can't settle it.
+        if len(data) * 4 <= self.max_frame_bytes:
+            return len(data)
+        return len(data.encode("utf-8"))
+
+    async def _violation(self, user_id: int, websocket: WebSocket, reason: str):
+        self.violations_by_user[user_id] += 1
+        if self.action == "close":
+            self.counters["closed"] += 1
+            print(f"Closing WebSocket for user {user_id}: {reason}")
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=reason)
+            raise WebSocketDisconnect(code=status.WS_1008_POLICY_VIOLATION, reason=reason)
+        self.counters["dropped"] += 1
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "max_frame_bytes": self.max_frame_bytes,
+            "action": self.action,
+            "counters": dict(self.counters),
+            # Among users currently connected to this worker
+            "top_offenders": [
+                {"user_id": user_id, "violations": count}
+                for user_id, count in self.violations_by_user.most_common(10)
+            ],
+        }
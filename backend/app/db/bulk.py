@@ -0,0 +1,74 @@
+# backend/app/db/bulk.py
+
+from typing import Dict, Iterable, Sequence, Tuple, Type
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING ... RETURNING
+_ON_CONFLICT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def get_or_create_many(
+    db: Session,
+    model: Type,
+    key_columns: Sequence[str],
+    rows: Iterable[dict],
+) -> Dict[Tuple, object]:
+    """
+    Finds or creates one `model` row per entry of `rows`, matching on
+    `key_columns`, which must be covered by a unique constraint. Returns
+    {key tuple: instance}.
+
+    It takes one SELECT when every row exists. Missing rows are added with a
+    single multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING. A concurrent
+    creator that wins the race just turns our insert into a no-op, so there are
+    no unique violations; those rows are picked up by a final SELECT.
+    Dialects without ON CONFLICT insert in a savepoint and reload on conflict.
+
+    Flushes but does not commit; the caller owns the transaction.
+    """
+    wanted = {}
+    for row in rows:
+        wanted.setdefault(tuple(row[column] for column in key_columns), row)
+    if not wanted:
+        return {}
+
+    key_expr = tuple_(*(getattr(model, column) for column in key_columns))
+
+    def key_of(instance):
+        return tuple(getattr(instance, column) for column in key_columns)
+
+    def load(keys):
+        return {key_of(instance): instance for instance in db.query(model).filter(key_expr.in_(list(keys)))}
+
+    found = load(wanted)
+    missing = [wanted[key] for key in wanted.keys() - found.keys()]
+    if not missing:
+        return found
+
+    insert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(model).values(missing).on_conflict_do_nothing(
+            index_elements=list(key_columns)
+        ).returning(model)
+        found.update({key_of(instance): instance for instance in db.scalars(stmt)})
+    else:
+        try:
+            with db.begin_nested():
+                created = [model(**row) for row in missing]
+                db.add_all(created)
+            found.update({key_of(instance): instance for instance in created})
+        except IntegrityError:
+            pass
+
+    # Rows another transaction created between our SELECT and INSERT
+    lost = wanted.keys() - found.keys()
+    if lost:
+        found.update(load(lost))
+    return found
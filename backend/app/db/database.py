@@ -1,5 +1,6 @@
 # backend/app/db/database.py
 
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import QueuePool
@@ -16,6 +17,16 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# For code that isn't a request handler, e.g. WebSocket handlers. Borrow a
+# session for one unit of work instead of holding one for the socket's lifetime.
+@contextmanager
+def session_scope():
     db = SessionLocal()
     try:
         yield db
@@ -2,6 +2,13 @@
 from fastapi import FastAPI
 from app.router import router
 from app.db.database import Base, engine
+from app.core.ws_manager import manager
+from app.core.ws_backplane import create_backplane
+from app.core.config import settings
+from app.services.message_writer import message_writer
+from app.services.message_archiver import message_archiver
+from app.services.lifecycle_scheduler import lifecycle_scheduler
+from app.services.password_hasher import password_hasher
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
@@ -62,8 +69,27 @@ async def lifespan(app: FastAPI):
     print("Starting up...")
     create_db_and_tables()
     print("Database tables created.")
+    backplane = create_backplane()
+    if backplane:
+        await manager.start_backplane(backplane)
+    if settings.WS_HEARTBEAT_INTERVAL_SECONDS > 0:
+        manager.start_heartbeat(
+            interval=settings.WS_HEARTBEAT_INTERVAL_SECONDS,
+            timeout=settings.WS_HEARTBEAT_TIMEOUT_SECONDS,
+        )
+    message_writer.start()
+    if settings.MESSAGE_HOT_DAYS > 0 and settings.MESSAGE_ARCHIVE_INTERVAL_MINUTES > 0:
+        message_archiver.start()
+    if settings.LIFECYCLE_INTERVAL_SECONDS > 0:
+        lifecycle_scheduler.start()
     yield
     print("Shutting down...")
+    await lifecycle_scheduler.stop()
+    await message_archiver.stop()
+    await message_writer.stop()
+    await manager.stop_heartbeat()
+    await manager.stop_backplane()
+    password_hasher.shutdown()
 
 # Create the FastAPI app instance with the lifespan event handler
 app = FastAPI(title="TripSync API", lifespan=lifespan)
@@ -80,4 +106,12 @@ app.include_router(router, prefix="/api")
 
 @app.get("/")
 def read_root():
-    return {"message": "TripSync API is running!"}
\ No newline at end of file
+    return {"message": "TripSync API is running!"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvicorn refuses frames over ws_max_size before buffering them, which the
+    # app-level check in InboundLimiter can't do
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, ws_max_size=settings.WS_MAX_FRAME_BYTES)
\ No newline at end of file
@@ -1,7 +1,7 @@
 from app.models.user_model import User, College
 from app.models.profile_model import Profile
 from app.models.pooling_model import PoolingRequest, PoolingConnection, PoolingConnectionStatus
-from app.models.message_model import Message
+from app.models.message_model import Message, ArchivedMessage
 from app.models.conversation_model import Conversation
 from app.models.service_model import ServicePost, ServiceApplication
 
@@ -1,6 +1,6 @@
 # backend/app/models/conversation_model.py
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -15,6 +15,22 @@ class Conversation(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Denormalized summary, kept up to date by message_service on every write
+    # so the inbox never has to look at the messages table.
+    # (No FK on last_message_id: messages already reference conversations.)
+    last_message_id = Column(Integer, nullable=True)
+    last_message_at = Column(DateTime, nullable=True)
+    last_message_sender_id = Column(Integer, nullable=True)
+    last_message_preview = Column(String(200), nullable=True)
+    user1_unread_count = Column(Integer, default=0, nullable=False)
+    user2_unread_count = Column(Integer, default=0, nullable=False)
+
+    # Read watermarks: id of the last message each participant has read. A
+    # message is read by its receiver if its id is at or below their watermark,
+    # and the unread counter above counts the partner's messages past it.
+    user1_last_read_message_id = Column(Integer, default=0, nullable=False)
+    user2_last_read_message_id = Column(Integer, default=0, nullable=False)
+
     # Relationships
     user1 = relationship("User", foreign_keys=[user1_id])
     user2 = relationship("User", foreign_keys=[user2_id])
@@ -25,3 +41,26 @@ class Conversation(Base):
         Index('ix_conversation_users', 'user1_id', 'user2_id', unique=True),
     )
 
+
+# Inbox reads: one ordered index scan per side of the conversation, in exactly
+# the inbox's sort order so the scan can stop after the page. SQLite can't say
+# NULLS LAST in an index, but it already sorts NULLs last under DESC.
+def _not_postgresql(ddl, target, bind, dialect=None, **kw):
+    return dialect.name != 'postgresql'
+
+Index(
+    'ix_conversation_user1_inbox',
+    Conversation.user1_id, Conversation.last_message_at.desc().nulls_last(), Conversation.id.desc()
+).ddl_if(dialect='postgresql')
+Index(
+    'ix_conversation_user2_inbox',
+    Conversation.user2_id, Conversation.last_message_at.desc().nulls_last(), Conversation.id.desc()
+).ddl_if(dialect='postgresql')
+Index(
+    'ix_conversation_user1_inbox',
+    Conversation.user1_id, Conversation.last_message_at.desc(), Conversation.id.desc()
+).ddl_if(callable_=_not_postgresql)
+Index(
+    'ix_conversation_user2_inbox',
+    Conversation.user2_id, Conversation.last_message_at.desc(), Conversation.id.desc()
+).ddl_if(callable_=_not_postgresql)
@@ -1,6 +1,6 @@
 # backend/app/models/message_model.py
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index, func, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -14,8 +14,45 @@ class Message(Base):
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
-    is_read = Column(Boolean, default=False)
+    # Read state lives in the conversation's read watermarks, not on each row
 
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
     sender = relationship("User")
+
+    __table_args__ = (
+        # History paging: a cursor page is one range scan of this index
+        Index('ix_message_conversation_created_id', 'conversation_id', 'created_at', 'id'),
+    )
+
+
+class ArchivedMessage(Base):
+    """
+    Cold messages moved out of `messages` by the archiver (see message_archiver),
+    so the hot table and its indexes only cover recent history. Rows keep their
+    original ids. Same columns as Message.
+    """
+    __tablename__ = "messages_archive"
+
+    id = Column(Integer, primary_key=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
+    sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    # Relationships
+    conversation = relationship("Conversation")
+    sender = relationship("User")
+
+    __table_args__ = (
+        Index('ix_message_archive_conversation_created_id', 'conversation_id', 'created_at', 'id'),
+    )
+
+
+# Full-text search over message content (Postgres only). Queries have to use
+# this exact expression for the planner to pick the GIN index.
+TEXT_SEARCH_CONFIG = text("'english'::regconfig")
+content_tsvector = func.to_tsvector(TEXT_SEARCH_CONFIG, Message.__table__.c.content)
+Index('ix_message_content_fts', content_tsvector, postgresql_using='gin').ddl_if(dialect='postgresql')
+archived_content_tsvector = func.to_tsvector(TEXT_SEARCH_CONFIG, ArchivedMessage.__table__.c.content)
+Index('ix_message_archive_content_fts', archived_content_tsvector, postgresql_using='gin').ddl_if(dialect='postgresql')
@@ -1,7 +1,7 @@
 # backend/app/models/pooling_model.py
 
 from datetime import datetime
-from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Float, Enum
+from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Float, Enum, Index, text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -47,6 +47,16 @@ class PoolingRequest(Base):
     sent_connections = relationship("PoolingConnection", foreign_keys="PoolingConnection.sender_request_id", back_populates="sender_request")
     received_connections = relationship("PoolingConnection", foreign_keys="PoolingConnection.receiver_request_id", back_populates="receiver_request")
 
+    __table_args__ = (
+        # Requests still waiting for a ride. The lifecycle scheduler cancels
+        # timed-out ones, so this stays as small as the live set.
+        Index(
+            'ix_pooling_requests_waiting_created', 'created_at',
+            postgresql_where=text("status IN ('ACTIVE', 'MATCHED')"),
+            sqlite_where=text("status IN ('ACTIVE', 'MATCHED')")
+        ),
+    )
+
 
 class PoolingConnection(Base):
     __tablename__ = "pooling_connections"
@@ -2,8 +2,9 @@
 
 from datetime import datetime
 from sqlalchemy import (Column, String, ForeignKey, DateTime, Integer, Text, 
-                        Float, Boolean, Enum as SQLAlchemyEnum, Table)
-from sqlalchemy.orm import relationship
+                        Float, Boolean, Enum as SQLAlchemyEnum, Table, Index, text)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 import enum
 
 from app.db.database import Base
@@ -19,6 +20,9 @@ class ApplicationStatus(str, enum.Enum):
     ACCEPTED = "accepted"
     REJECTED = "rejected"
 
+# Text search configuration for service post search (see service_service.search_vector)
+TEXT_SEARCH_CONFIG = text("'english'::regconfig")
+
 class ServiceStatus(str, enum.Enum):
     OPEN = "open"
     IN_PROGRESS = "in_progress"
@@ -35,6 +39,16 @@ class Tag(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, index=True, nullable=False)
 
+class UserTagAffinity(Base):
+    """
+    How much a user cares about a tag, accumulated from the posts they apply to
+    and create (see feed_ranking). Read as a sparse vector by the "for you" feed.
+    """
+    __tablename__ = "user_tag_affinity"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True)
+    weight = Column(Float, default=0, nullable=False)
+
 class ServicePost(Base):
     __tablename__ = "service_posts"
 
@@ -55,6 +69,16 @@ class ServicePost(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Weighted title (A) / tags (B) / description (C) document for full-text
+    # search, written by service_service whenever the post is saved. Postgres only.
+    search_vector = deferred(Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True))
+
+    # Application counts by status, kept up to date by service_service so the
+    # feed can show them without counting service_applications.
+    applications_pending = Column(Integer, default=0, nullable=False)
+    applications_accepted = Column(Integer, default=0, nullable=False)
+    applications_rejected = Column(Integer, default=0, nullable=False)
     
     # --- THIS IS THE FIX ---
     # The old 'requirements' and 'filters' relationships are now completely removed.
@@ -63,6 +87,25 @@ class ServicePost(Base):
     applications = relationship("ServiceApplication", back_populates="service_post", cascade="all, delete-orphan")
     reviews = relationship("ServiceReview", back_populates="service_post", cascade="all, delete-orphan")
 
+    @property
+    def application_count(self) -> int:
+        return self.applications_pending + self.applications_accepted + self.applications_rejected
+
+    __table_args__ = (
+        Index('ix_service_posts_search_vector', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        # Feed pages: open posts newest first, keyset on (created_at, id). A
+        # backward scan serves the DESC order.
+        Index('ix_service_posts_status_created_id', 'status', 'created_at', 'id'),
+        # Open posts with a deadline, for the lifecycle scheduler
+        Index(
+            'ix_service_posts_open_deadline', 'deadline',
+            postgresql_where=text("status = 'OPEN' AND deadline IS NOT NULL"),
+            sqlite_where=text("status = 'OPEN' AND deadline IS NOT NULL")
+        ),
+        # A user's own posts, left out of their "for you" feed
+        Index('ix_service_posts_poster', 'poster_user_id'),
+    )
+
 # --- We no longer need the old ServiceRequirement and ServiceFilter models, ---
 # --- but we keep the Application and Review models. ---
 
@@ -82,6 +125,13 @@ class ServiceApplication(Base):
     service_post = relationship("ServicePost", back_populates="applications")
     applicant = relationship("User")
 
+    __table_args__ = (
+        # Applicant lists: newest first per post, keyset on (application_date, id)
+        Index('ix_service_applications_post_date', 'service_post_id', 'application_date', 'id'),
+        # Posts a user applied to, left out of their "for you" feed
+        Index('ix_service_applications_applicant', 'applicant_user_id', 'service_post_id'),
+    )
+
 class ServiceReview(Base):
     __tablename__ = "service_reviews"
     id = Column(Integer, primary_key=True, index=True)
@@ -1,63 +1,137 @@
 # backend/app/routes/chat_ws_router.py
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException
+from typing import Optional
 import json
 
-from app.db.database import get_db
 from app.services import auth_service
-from app.core.ws_manager import manager
+from app.services.message_writer import message_writer
+from app.core.ws_manager import manager, CHAT_CHANNEL
 from app.models import user_model
 
 router = APIRouter()
 
+async def _persist_and_deliver(websocket: WebSocket, sender: user_model.User, message_data: dict):
+    """
+    Stores a message sent over the socket, acknowledges it to the sender with the
+    assigned id and relays it to the receiver. Replaces POST /api/chat/messages
+    followed by a separate relay frame.
+    """
+    client_id = message_data.get("client_id")
+    receiver_id = message_data.get("receiver_id")
+    content = (message_data.get("content") or "").strip()
+
+    if not isinstance(receiver_id, int) or not content:
+        await websocket.send_json({
+            "type": "message_error",
+            "client_id": client_id,
+            "detail": "receiver_id and content are required"
+        })
+        return
+
+    try:
+        saved = await message_writer.submit(sender.id, receiver_id, content)
+    except HTTPException as e:
+        await websocket.send_json({"type": "message_error", "client_id": client_id, "detail": e.detail})
+        return
+    except Exception as e:
+        print(f"Failed to store chat message from user {sender.id}: {e}")
+        await websocket.send_json({"type": "message_error", "client_id": client_id, "detail": "Message could not be saved"})
+        return
+
+    message = {
+        "id": saved["id"],
+        "conversation_id": saved["conversation_id"],
+        "sender_id": sender.id,
+        "sender_name": sender.full_name,
+        "content": saved["content"],
+        "created_at": saved["created_at"].isoformat(),
+        "is_read": saved["is_read"],
+    }
+    await websocket.send_json({"type": "message_ack", "client_id": client_id, "message": message})
+    await manager.send_personal_message(
+        {
+            "type": "chat_message",
+            "message_id": message["id"],
+            "conversation_id": message["conversation_id"],
+            "sender_id": sender.id,
+            "sender_name": sender.full_name,
+            "content": message["content"],
+            "created_at": message["created_at"]
+        },
+        receiver_id
+    )
+
 @router.websocket("/ws/chat")
 async def chat_websocket(
     websocket: WebSocket,
     token: str = Query(...),
-    db: Session = Depends(get_db)
+    last_seq: Optional[int] = Query(None),
+    log_id: Optional[str] = Query(None),
 ):
     """
     Dedicated WebSocket endpoint for chat messaging.
     Separate from pooling WebSocket to avoid conflicts.
+
+    No DB session is held for the socket's lifetime: authentication uses a
+    short-lived one, and per-message DB work should borrow one via session_scope().
+
+    Send `{"type": "send_message", "client_id": ..., "receiver_id": ..., "content": ...}`
+    to store and deliver a message in one hop. The sender gets a `message_ack` with
+    the stored message (or a `message_error`), the receiver a `chat_message`.
     """
+    user_id = None
     try:
         # Authenticate user
-        current_user = await auth_service.get_current_user_ws(token=token, db=db)
+        current_user = await auth_service.get_current_user_ws(token=token)
+        if not current_user:
+            await websocket.close(code=1008)
+            return
         user_id = current_user.id
         
         # Accept connection and register with manager
-        await manager.connect(websocket, user_id)
+        await manager.connect(user_id, websocket, CHAT_CHANNEL, last_seq=last_seq, log_id=log_id)
         
-        try:
-            while True:
-                # Receive message from client
-                data = await websocket.receive_text()
+        while True:
+            # Receive message from client
+            data = await websocket.receive_text()
+            manager.touch(user_id, websocket)
+            if not await manager.inbound.admit(user_id, websocket, data):
+                continue
+            try:
                 message_data = json.loads(data)
+            except json.JSONDecodeError:
+                message_data = None
+            if not isinstance(message_data, dict):
+                # A bad frame shouldn't cost the client its connection
+                await websocket.send_json({"type": "error", "detail": "Invalid JSON message"})
+                continue
+            
+            msg_type = message_data.get("type")
+            
+            if msg_type == "send_message":
+                await _persist_and_deliver(websocket, current_user, message_data)
+            elif msg_type == "chat_message":
+                # Forward chat message to receiver
+                receiver_id = message_data.get("receiver_id")
+                if receiver_id:
+                    await manager.send_personal_message(
+                        {
+                            "type": "chat_message",
+                            "message_id": message_data.get("message_id"),
+                            "connection_id": message_data.get("connection_id"),
+                            "sender_id": user_id,
+                            "content": message_data.get("content"),
+                            "created_at": message_data.get("created_at")
+                        },
+                        receiver_id
+                    )
+            elif msg_type == "ping":
+                # Respond to ping to keep connection alive
+                await websocket.send_json({"type": "pong"})
                 
-                msg_type = message_data.get("type")
-                
-                if msg_type == "chat_message":
-                    # Forward chat message to receiver
-                    receiver_id = message_data.get("receiver_id")
-                    if receiver_id:
-                        await manager.send_personal_message(
-                            {
-                                "type": "chat_message",
-                                "message_id": message_data.get("message_id"),
-                                "connection_id": message_data.get("connection_id"),
-                                "sender_id": user_id,
-                                "content": message_data.get("content"),
-                                "created_at": message_data.get("created_at")
-                            },
-                            receiver_id
-                        )
-                elif msg_type == "ping":
-                    # Respond to ping to keep connection alive
-                    await websocket.send_json({"type": "pong"})
-                    
-        except WebSocketDisconnect:
-            manager.disconnect(user_id)
+    except WebSocketDisconnect:
+        pass
             
     except Exception as e:
         print(f"Chat WebSocket error: {e}")
@@ -65,3 +139,8 @@ async def chat_websocket(
             await websocket.close()
         except:
             pass
+
+    finally:
+        # Whatever ended the loop, don't leave this socket registered
+        if user_id is not None:
+            manager.disconnect(user_id, websocket)
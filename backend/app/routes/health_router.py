@@ -2,9 +2,35 @@
 
 from fastapi import APIRouter
 
+from app.core.ws_manager import manager
+from app.services.feed_cache import feed_cache
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+
 router = APIRouter()
 
 @router.get("/ping")
 def ping_pong():
     """A simple health check endpoint."""
-    return {"ping": "pong!"}
\ No newline at end of file
+    return {"ping": "pong!"}
+
+@router.get("/ws")
+def websocket_stats():
+    """WebSocket connection counts, reaper activity and connection ages for this worker."""
+    return manager.stats()
+
+@router.get("/feed-cache")
+def feed_cache_stats():
+    """Services feed cache size and hit rate for this worker."""
+    return feed_cache.stats()
+
+@router.get("/password-hashing")
+def password_hashing_stats():
+    """bcrypt pool load, rejections and timings for this worker."""
+    return password_hasher.stats()
+
+
+@router.get("/auth-cache")
+def auth_cache_stats():
+    """Authenticated-principal cache size and hit rate for this worker."""
+    return principal_cache.stats()
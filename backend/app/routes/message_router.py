@@ -2,15 +2,26 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.db.database import get_db
-from app.services import auth_service, message_service, conversation_service
+from app.services import auth_service, message_service, message_search, conversation_service
 from app.schemas import message_schema
 from app.models import user_model
 
 router = APIRouter()
 
+def _message_response(message, conversation) -> message_schema.Message:
+    return message_schema.Message(
+        id=message.id,
+        conversation_id=message.conversation_id,
+        sender_id=message.sender_id,
+        sender_name=message.sender.full_name,
+        content=message.content,
+        created_at=message.created_at,
+        is_read=message_service.is_message_read(conversation, message)
+    )
+
 @router.post("/messages", response_model=message_schema.Message)
 async def send_message(
     message_data: message_schema.MessageCreate,
@@ -33,39 +44,41 @@ async def send_message(
         sender_name=current_user.full_name,
         content=message.content,
         created_at=message.created_at,
-        is_read=message.is_read
+        is_read=False
     )
 
 
 @router.get("/messages/{conversation_id}", response_model=message_schema.MessageListResponse)
 async def get_messages(
     conversation_id: int,
+    before: Optional[str] = Query(None, description="Cursor; return messages older than it"),
+    after: Optional[str] = Query(None, description="Cursor; return messages newer than it"),
+    limit: int = Query(100, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_service.get_current_user),
 ):
     """
-    Get all messages for a conversation.
+    Get a page of messages for a conversation, oldest first.
+    Without a cursor returns the latest messages. Pass `oldest_cursor` as
+    `before` to scroll back, or `newest_cursor` as `after` to catch up.
     """
-    messages = message_service.get_messages_for_conversation(
+    conversation, messages, has_more = message_service.get_messages_for_conversation(
         db=db,
         user=current_user,
-        conversation_id=conversation_id
+        conversation_id=conversation_id,
+        limit=limit,
+        before=before,
+        after=after
     )
     
-    message_list = [
-        message_schema.Message(
-            id=msg.id,
-            conversation_id=msg.conversation_id,
-            sender_id=msg.sender_id,
-            sender_name=msg.sender.full_name,
-            content=msg.content,
-            created_at=msg.created_at,
-            is_read=msg.is_read
-        )
-        for msg in messages
-    ]
+    message_list = [_message_response(msg, conversation) for msg in messages]
     
-    return message_schema.MessageListResponse(messages=message_list)
+    return message_schema.MessageListResponse(
+        messages=message_list,
+        oldest_cursor=message_service.encode_message_cursor(messages[0]) if messages else None,
+        newest_cursor=message_service.encode_message_cursor(messages[-1]) if messages else None,
+        has_more=has_more
+    )
 
 
 @router.post("/messages/{conversation_id}/read")
@@ -88,21 +101,86 @@ async def mark_messages_read(
 
 @router.get("/conversations")
 async def get_recent_conversations(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_service.get_current_user),
 ):
     """
-    Get all recent conversations for the current user.
+    Get recent conversations for the current user, most recent first.
     Returns conversations with last message and unread count.
     """
     conversations = message_service.get_recent_conversations(
         db=db,
-        user=current_user
+        user=current_user,
+        skip=skip,
+        limit=limit
     )
     
     return {"conversations": conversations}
 
 
+@router.get("/sync", response_model=message_schema.SyncResponse)
+async def sync_chats(
+    since: Optional[str] = Query(None, description="Cursor from the previous sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(auth_service.get_current_user),
+):
+    """
+    Delta sync across all of the user's conversations, for reconnects and app
+    resumes: new messages plus the inbox entries (summary, unread count and read
+    watermarks) of conversations that changed since the cursor.
+    Call without `since` right before the initial load to get a starting cursor.
+    """
+    changes = message_service.get_changes_since(
+        db=db,
+        user=current_user,
+        since=since,
+        limit=limit
+    )
+
+    return message_schema.SyncResponse(
+        messages=[_message_response(msg, msg.conversation) for msg in changes["messages"]],
+        conversations=changes["conversations"],
+        cursor=changes["cursor"],
+        has_more=changes["has_more"]
+    )
+
+
+@router.get("/search", response_model=message_schema.MessageSearchResponse)
+async def search_messages(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(auth_service.get_current_user),
+):
+    """
+    Search the current user's chat history, best match first.
+    Each result carries a highlighted snippet of the matching message.
+    """
+    found = message_search.search_messages(
+        db=db,
+        user=current_user,
+        q=q,
+        cursor=cursor,
+        limit=limit
+    )
+
+    return message_schema.MessageSearchResponse(
+        results=[
+            message_schema.MessageSearchHit(
+                **_message_response(msg, msg.conversation).model_dump(),
+                snippet=snippet,
+                rank=rank
+            )
+            for msg, rank, snippet in found["results"]
+        ],
+        next_cursor=found["next_cursor"]
+    )
+
+
 @router.get("/conversations/find-or-create")
 async def find_or_create_conversation(
     partner_id: int = Query(..., description="The ID of the user to chat with"),
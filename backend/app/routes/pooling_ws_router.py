@@ -1,13 +1,12 @@
 # backend/app/routes/pooling_ws_router.py
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
+from typing import Optional
 import json
 
-from app.core.ws_manager import manager
+from app.core.ws_manager import manager, POOL_CHANNEL
 from app.services import auth_service
-from app.models import user_model, message_model
-from app.db.database import get_db
-from sqlalchemy.orm import Session
+from app.models import user_model
 
 router = APIRouter()
 
@@ -16,7 +15,11 @@ async def websocket_endpoint(
     websocket: WebSocket,
     # We protect the WebSocket just like an HTTP endpoint.
     # The token will be sent as a subprotocol from the client.
-    current_user: user_model.User = Depends(auth_service.get_current_user_from_token)
+    current_user: user_model.User = Depends(auth_service.get_current_user_from_token),
+    # The last event `seq` the client received, to replay what it missed while offline.
+    last_seq: Optional[int] = Query(None),
+    # The `log_id` of that event; seqs from another worker's log can't be replayed.
+    log_id: Optional[str] = Query(None)
 ):
     """
     Handles the WebSocket connection for a user waiting for a pool match.
@@ -24,6 +27,9 @@ async def websocket_endpoint(
     The frontend must connect to this endpoint with a 'token' subprotocol
     containing the valid JWT.
     e.g., new WebSocket("ws://...", ["token", "your_jwt_here"])
+
+    A reconnecting client should pass `?last_seq=<seq>&log_id=<log_id>` of the
+    last event it saw.
     """
     if not current_user:
         # If the token is invalid, close the connection.
@@ -31,13 +37,16 @@ async def websocket_endpoint(
         return
 
     # If the token is valid, accept the connection and add it to the manager.
-    await manager.connect(current_user.id, websocket)
+    await manager.connect(current_user.id, websocket, POOL_CHANNEL, last_seq=last_seq, log_id=log_id)
     
     try:
         # This loop will keep the connection alive.
         # It waits for messages from the client (we can handle chat messages here).
         while True:
             data = await websocket.receive_text()
+            manager.touch(current_user.id, websocket)
+            if not await manager.inbound.admit(current_user.id, websocket, data):
+                continue
             
             try:
                 message_data = json.loads(data)
@@ -68,4 +77,4 @@ async def websocket_endpoint(
 
     except WebSocketDisconnect:
         # This block is executed when the client disconnects.
-        manager.disconnect(current_user.id)
\ No newline at end of file
+        manager.disconnect(current_user.id, websocket)
\ No newline at end of file
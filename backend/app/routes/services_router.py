@@ -1,6 +1,7 @@
 # backend/app/routes/services_router.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -8,9 +9,12 @@ from app.db.database import get_db
 from app.services import service_service, auth_service
 from app.schemas import service_schema
 from app.models import user_model
+from app.services.feed_cache import feed_cache
 
 router = APIRouter()
 
+_feed_page = TypeAdapter(List[service_schema.ServicePostList])
+
 @router.post("", response_model=service_schema.ServicePostDetail, status_code=status.HTTP_201_CREATED)
 def create_new_service_post(
     post_data: service_schema.ServicePostCreate,
@@ -33,10 +37,63 @@ def get_all_open_service_posts(
     skip: int = 0,
     limit: int = 20,
     search: Optional[str] = None,
-    tags: Optional[List[str]] = Query(None)
+    tags: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; replaces skip"),
+    include_total: bool = Query(False, description="Send an approximate total in X-Total-Estimate"),
 ):
-    posts = service_service.get_all_service_posts(db=db, skip=skip, limit=limit, search=search, tags=tags)
-    return posts
+    """
+    Open service posts, newest first (or by relevance with a search).
+    When more posts follow, the next page's cursor is sent in the X-Next-Cursor header.
+    Pages are served from the feed cache when possible.
+    """
+    # Keyed on the query as the service sees it, so e.g. "Design " and "design"
+    # share an entry (matching is case-insensitive either way)
+    search = search.strip() if search else None
+    cache_key = (
+        search.lower() if search else None,
+        tuple(sorted(set(service_service.normalize_tags(tags)))),
+        cursor, skip, limit, include_total
+    )
+    cached = feed_cache.get(cache_key)
+    if cached:
+        body, headers = cached
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    version = feed_cache.version
+    # One extra post tells whether another page follows
+    posts = service_service.get_all_service_posts(
+        db=db, skip=skip, limit=limit + 1, search=search, tags=tags, cursor=cursor
+    )
+    has_more = len(posts) > limit
+    posts = posts[:limit]
+    headers = {}
+    if has_more and not search:
+        headers["X-Next-Cursor"] = service_service.encode_feed_cursor(posts[-1])
+    if include_total:
+        headers["X-Total-Estimate"] = str(
+            service_service.estimate_open_service_posts(db=db, search=search, tags=tags)
+        )
+
+    # Serialized once here; anonymous posters were already masked by the service.
+    body = _feed_page.dump_json(_feed_page.validate_python(posts, from_attributes=True))
+    feed_cache.put(cache_key, body, headers, version)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/for-you", response_model=List[service_schema.ServicePostList])
+def get_personalized_service_posts(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(auth_service.get_current_user),
+):
+    """
+    Open service posts ranked for the current user by the tags of the posts they
+    applied to and created, and the "interests" in their profile preferences.
+    Posts matching none of those follow, newest first. Not cached.
+    """
+    return service_service.get_personalized_service_posts(
+        db=db, user=current_user, skip=skip, limit=limit
+    )
 
 @router.get("/{post_id}", response_model=service_schema.ServicePostDetail)
 def get_single_service_post(
@@ -78,11 +135,22 @@ def apply_for_service(
 
 @router.get("/{post_id}/applications", response_model=List[service_schema.ServiceApplication])
 def get_post_applications(
+    response: Response,
     post_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(auth_service.get_current_user),
 ):
-    applications = service_service.get_applications_for_post(db=db, post_id=post_id, user=current_user)
+    """
+    Applications for one of the current user's posts, newest first.
+    When more follow, the next page's cursor is sent in the X-Next-Cursor header.
+    """
+    applications = service_service.get_applications_for_post(
+        db=db, post_id=post_id, user=current_user, limit=limit, cursor=cursor
+    )
+    if len(applications) == limit:
+        response.headers["X-Next-Cursor"] = service_service.encode_application_cursor(applications[-1])
     return applications
 
 @router.put("/applications/{application_id}", response_model=service_schema.ServiceApplication)
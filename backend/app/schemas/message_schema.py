@@ -22,3 +22,27 @@ class Message(BaseModel):
 
 class MessageListResponse(BaseModel):
     messages: list[Message]
+    # Pass as `before` to load older messages, or as `after` to load newer ones
+    oldest_cursor: Optional[str] = None
+    newest_cursor: Optional[str] = None
+    # Whether more messages exist in the direction that was requested
+    has_more: bool = False
+
+class MessageSearchHit(Message):
+    # Matching excerpt with the matched words wrapped in <b></b>
+    snippet: str
+    rank: float
+
+class MessageSearchResponse(BaseModel):
+    results: list[MessageSearchHit]
+    # Pass as `cursor` to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class SyncResponse(BaseModel):
+    messages: list[Message]
+    # Current inbox entries (as in /conversations) for conversations that changed
+    conversations: list[dict]
+    # Pass as `since` on the next sync
+    cursor: str
+    # More messages are waiting; sync again right away with `cursor`
+    has_more: bool = False
@@ -63,6 +63,10 @@ class ServicePostBase(BaseModel):
     created_at: datetime
     poster: Optional[ProfileBase] = None
     tags: List[Tag] = []
+    application_count: int = 0
+    applications_pending: int = 0
+    applications_accepted: int = 0
+    applications_rejected: int = 0
     class Config:
         from_attributes = True
 
@@ -7,4 +7,5 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    email: str | None = None
\ No newline at end of file
+    email: str | None = None
+    user_id: int | None = None
\ No newline at end of file
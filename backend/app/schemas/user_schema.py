@@ -2,7 +2,10 @@
 
 # --- REMOVE THIS IMPORT ---
 # import uuid
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
+
+# bcrypt only uses (and recent versions only accept) the first 72 bytes
+MAX_PASSWORD_BYTES = 72
 
 # --- College Schemas ---
 class CollegeBase(BaseModel):
@@ -28,6 +31,13 @@ class UserCreate(UserBase):
     password: str
     college_name: str
 
+    @field_validator("password")
+    @classmethod
+    def password_fits_bcrypt(cls, password: str) -> str:
+        if len(password.encode("utf-8")) > MAX_PASSWORD_BYTES:
+            raise ValueError(f"Password must be at most {MAX_PASSWORD_BYTES} bytes")
+        return password
+
 class User(UserBase):
     # --- CHANGE THESE TWO LINES ---
     id: int
@@ -5,12 +5,14 @@ from fastapi import Depends, HTTPException, status, WebSocket
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
-from app.db.database import get_db
+from app.db.database import get_db, session_scope
 from app.services import user_service
 from app.schemas import token_schema
 from app.models import user_model
+from app.services.principal_cache import principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
@@ -23,32 +25,87 @@ def create_access_token(data: dict):
     )
     return encoded_jwt
 
+def decode_token(token: str) -> token_schema.TokenData | None:
+    """
+    Claims of a valid token, or None. Decoded claims are memoized per token
+    until it expires, so repeat requests skip the signature check.
+    """
+    claims = principal_cache.get_claims(token)
+    if claims is not None:
+        return claims
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+    user_id = payload.get("uid")
+    claims = token_schema.TokenData(email=email, user_id=user_id if isinstance(user_id, int) else None)
+    principal_cache.put_claims(token, payload.get("exp"), claims)
+    return claims
+
+def _load_principal(db: Session, claims: token_schema.TokenData) -> user_model.User | None:
+    """Loads the token's user, by primary key when the token carries one, and caches it."""
+    version = principal_cache.version(claims.user_id)
+    if claims.user_id is not None:
+        user = db.get(user_model.User, claims.user_id)
+    else:
+        user = user_service.get_user_by_email(db, email=claims.email)
+    # A token issued before an email change no longer authenticates
+    if user is None or user.email != claims.email:
+        return None
+    principal_cache.put(user, version)
+    return user
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    The token's user, usually served from the per-worker principal cache.
+    Changes made through this worker are seen at once. A change made through
+    another worker, such as a profile update, can go unseen here for up to
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = token_schema.TokenData(email=email)
-    except JWTError:
+    claims = decode_token(token)
+    if claims is None:
         raise credentials_exception
-    
-    user = user_service.get_user_by_email(db, email=token_data.email)
+
+    cached = principal_cache.get(claims.email)
+    if cached is not None:
+        # Attach to the request's session without a query; relationships still
+        # load lazily from there.
+        return db.merge(cached, load=False)
+
+    user = _load_principal(db, claims)
     if user is None:
         raise credentials_exception
     return user
 
-async def get_current_user_from_token(
-    websocket: WebSocket,
-    db: Session = Depends(get_db)
-) -> user_model.User | None:
+def _load_ws_principal(claims: token_schema.TokenData) -> user_model.User | None:
+    """
+    Loads the user for a WebSocket with a short-lived session. The session is
+    closed before the socket starts, so an open socket never pins a pooled DB
+    connection. The returned user is detached: its columns are loaded, but
+    relationships must be read inside a new session.
+    """
+    with session_scope() as db:
+        return _load_principal(db, claims)
+
+async def get_current_user_ws(token: str) -> user_model.User | None:
+    """Authenticates a WebSocket connection from a raw JWT (e.g. a `token` query param)."""
+    claims = decode_token(token)
+    if claims is None:
+        return None
+    cached = principal_cache.get(claims.email)
+    if cached is not None:
+        return cached
+    return await run_in_threadpool(_load_ws_principal, claims)
+
+async def get_current_user_from_token(websocket: WebSocket) -> user_model.User | None:
     """
     Authenticates a user for a WebSocket connection.
     Reads the token from the 'token' subprotocol.
@@ -57,14 +114,7 @@ async def get_current_user_from_token(
         token_protocol, token = websocket.scope['subprotocols']
         if token_protocol != 'token' or not token:
             return None
+    except (ValueError, KeyError):
+        return None
 
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-            
-        user = user_service.get_user_by_email(db, email=email)
-        return user
-        
-    except (ValueError, KeyError, JWTError):
-        return None
\ No newline at end of file
+    return await get_current_user_ws(token)
\ No newline at end of file
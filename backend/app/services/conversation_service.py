@@ -2,8 +2,9 @@
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from typing import Optional
+from typing import Dict, Iterable, Optional, Tuple
 
+from app.db.bulk import get_or_create_many
 from app.models import conversation_model, user_model
 
 def find_or_create_conversation(
@@ -16,33 +17,31 @@ def find_or_create_conversation(
     Ensures user1_id < user2_id for consistency (sorted user IDs).
     """
     # Sort user IDs to ensure consistency
-    sorted_user1 = min(user1_id, user2_id)
-    sorted_user2 = max(user1_id, user2_id)
-    
-    # Try to find existing conversation
-    conversation = db.query(conversation_model.Conversation).filter(
-        and_(
-            conversation_model.Conversation.user1_id == sorted_user1,
-            conversation_model.Conversation.user2_id == sorted_user2
-        )
-    ).first()
-    
-    if conversation:
-        return conversation
-    
-    # Create new conversation
-    conversation = conversation_model.Conversation(
-        user1_id=sorted_user1,
-        user2_id=sorted_user2
-    )
-    
-    db.add(conversation)
+    key = (min(user1_id, user2_id), max(user1_id, user2_id))
+    conversation = find_or_create_conversations(db, [key])[key]
     db.commit()
-    db.refresh(conversation)
     
     return conversation
 
 
+def find_or_create_conversations(
+    db: Session,
+    pairs: Iterable[Tuple[int, int]]
+) -> Dict[Tuple[int, int], conversation_model.Conversation]:
+    """
+    Bulk version of find_or_create_conversation for many user pairs at once.
+    Returns a dict keyed by the sorted (user1_id, user2_id) pair.
+    Flushes new conversations but does not commit; the caller owns the transaction.
+    """
+    wanted = {(min(a, b), max(a, b)) for a, b in pairs}
+    return get_or_create_many(
+        db,
+        conversation_model.Conversation,
+        ["user1_id", "user2_id"],
+        [{"user1_id": u1, "user2_id": u2} for u1, u2 in wanted]
+    )
+
+
 def get_conversation_by_id(
     db: Session,
     conversation_id: int
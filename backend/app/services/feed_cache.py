@@ -0,0 +1,84 @@
+# backend/app/services/feed_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+
+class FeedCache:
+    """
+    Bounded LRU cache of serialized services-feed pages (response body plus
+    headers).
+
+    Every write that can change the feed calls `invalidate()`, which bumps a
+    version number. Entries stored under an older version are never served
+    again, and age out of the LRU. Writes made by other workers can't bump this
+    worker's version, so entries also expire after `ttl` seconds.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        # key -> (version, stored_at, body, headers)
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self.version or time.monotonic() - entry[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2], entry[3]
+
+    def put(self, key: Hashable, body: bytes, headers: Dict[str, str], version: int):
+        """
+        Stores a page rendered while the cache was at `version`. A page rendered
+        before an invalidation that happened mid-request is dropped.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (version, time.monotonic(), body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+feed_cache = FeedCache(
+    max_entries=settings.SERVICE_FEED_CACHE_SIZE,
+    ttl=settings.SERVICE_FEED_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,94 @@
+# backend/app/services/feed_ranking.py
+
+import heapq
+from typing import Collection, Dict, Iterable, List, Set
+
+from sqlalchemy.orm import Session
+
+from app.db.bulk import get_or_create_many
+from app.models import user_model, profile_model, service_model
+from app.services.tag_index import tag_index
+
+# How much one event adds to a user's affinity for each tag of the post
+APPLICATION_WEIGHT = 1.0
+POST_WEIGHT = 0.5
+# Weight of each tag listed under "interests" in the profile preferences
+PROFILE_INTEREST_WEIGHT = 2.0
+
+
+def record_interest(db: Session, user_id: int, tag_ids: Iterable[int], weight: float):
+    """
+    Adds `weight` to the user's affinity for each tag. Flushes but does not
+    commit; the caller owns the transaction.
+
+    Affinities only ever grow. They record interest the user has shown, and
+    deleting a post or a rejected application doesn't take that back (there is
+    no way to withdraw an application). A path that undoes an event outright
+    should call this with the negated weight.
+    """
+    tag_ids = list(set(tag_ids))
+    if not tag_ids:
+        return
+    UserTagAffinity = service_model.UserTagAffinity
+    get_or_create_many(
+        db, UserTagAffinity, ["user_id", "tag_id"],
+        [{"user_id": user_id, "tag_id": tag_id, "weight": 0} for tag_id in tag_ids]
+    )
+    db.query(UserTagAffinity).filter(
+        UserTagAffinity.user_id == user_id,
+        UserTagAffinity.tag_id.in_(tag_ids)
+    ).update({UserTagAffinity.weight: UserTagAffinity.weight + weight}, synchronize_session=False)
+
+
+def user_tag_weights(db: Session, user: user_model.User) -> Dict[str, float]:
+    """The user's tag affinity vector: stored affinities plus profile interests."""
+    UserTagAffinity = service_model.UserTagAffinity
+    weights = dict(
+        db.query(service_model.Tag.name, UserTagAffinity.weight).join(
+            UserTagAffinity, UserTagAffinity.tag_id == service_model.Tag.id
+        ).filter(UserTagAffinity.user_id == user.id).all()
+    )
+
+    preferences = db.query(profile_model.Profile.preferences).filter(
+        profile_model.Profile.user_id == user.id
+    ).scalar() or {}
+    interests = preferences.get("interests")
+    if isinstance(interests, list):
+        for name in interests:
+            if isinstance(name, str) and name.strip():
+                name = name.lower().strip()
+                weights[name] = weights.get(name, 0) + PROFILE_INTEREST_WEIGHT
+    return weights
+
+
+def seen_post_ids(db: Session, user: user_model.User) -> Set[int]:
+    """Open posts the user created, and posts they already applied to."""
+    ServicePost = service_model.ServicePost
+    ServiceApplication = service_model.ServiceApplication
+    own = db.query(ServicePost.id).filter(
+        ServicePost.poster_user_id == user.id,
+        ServicePost.status == service_model.ServiceStatus.OPEN
+    )
+    applied = db.query(ServiceApplication.service_post_id).filter(
+        ServiceApplication.applicant_user_id == user.id
+    )
+    return {post_id for (post_id,) in own.union_all(applied)}
+
+
+def rank_post_ids(
+    db: Session, user: user_model.User, count: int, exclude: Collection[int] = ()
+) -> List[int]:
+    """
+    Ids of the `count` OPEN posts outside `exclude` that best match the user's
+    tag affinities, best first; newer posts win ties. Shorter when fewer posts
+    share a tag with the user.
+    """
+    weights = user_tag_weights(db, user)
+    if not weights or count <= 0:
+        return []
+
+    scores = tag_index.score_posts(db, weights)
+    for post_id in exclude:
+        scores.pop(post_id, None)
+    best = heapq.nlargest(count, scores.items(), key=lambda item: (item[1], item[0]))
+    return [post_id for post_id, score in best if score > 0]
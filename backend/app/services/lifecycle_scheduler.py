@@ -0,0 +1,107 @@
+# backend/app/services/lifecycle_scheduler.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.ws_manager import manager
+from app.db.database import session_scope
+from app.services import pooling_service, service_service
+
+logger = logging.getLogger(__name__)
+
+
+class LifecycleScheduler:
+    """
+    Background job that retires rows nobody will act on any more. Every
+    `interval` seconds it cancels OPEN service posts past their deadline and
+    ACTIVE / MATCHED pooling requests older than `pooling_timeout_minutes`,
+    a batch per UPDATE, and tells the owners over their sockets.
+    """
+
+    def __init__(self, interval: float, batch_size: int, pooling_timeout_minutes: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pooling_timeout_minutes = pooling_timeout_minutes
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"runs": 0, "expired_posts": 0, "expired_pooling_requests": 0, "failed_runs": 0}
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Lifecycle run failed: {e}")
+                self.stats["failed_runs"] += 1
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> dict:
+        """Expires everything currently due. Returns how many posts and requests were cancelled."""
+        now = datetime.utcnow()
+        posts = await self._drain(
+            lambda db: service_service.expire_service_posts(db, now, self.batch_size),
+            lambda rows: [
+                ({"type": "service_post_expired", "post_id": post_id, "title": title}, poster_id)
+                for post_id, poster_id, title in rows
+            ],
+        )
+        cutoff = now - timedelta(minutes=self.pooling_timeout_minutes)
+        requests = await self._drain(
+            lambda db: pooling_service.expire_pooling_requests(db, cutoff, self.batch_size),
+            lambda rows: [
+                ({"type": "pooling_request_expired", "request_id": request_id}, user_id)
+                for request_id, user_id in rows
+            ],
+        )
+
+        self.stats["runs"] += 1
+        self.stats["expired_posts"] += posts
+        self.stats["expired_pooling_requests"] += requests
+        if posts or requests:
+            logger.info(f"Expired {posts} service posts and {requests} pooling requests")
+        return {"expired_posts": posts, "expired_pooling_requests": requests}
+
+    async def _drain(self, expire_batch: Callable, notifications: Callable) -> int:
+        """Runs `expire_batch` until it comes back short, notifying after each batch."""
+        total = 0
+        while True:
+            rows = await run_in_threadpool(self._in_session, expire_batch)
+            total += len(rows)
+            await self._notify(notifications(rows))
+            if len(rows) < self.batch_size:
+                return total
+
+    @staticmethod
+    def _in_session(expire_batch: Callable) -> List[tuple]:
+        with session_scope() as db:
+            return expire_batch(db)
+
+    @staticmethod
+    async def _notify(events: List[tuple]):
+        # One batch of sends at a time; a slow socket only delays its own send
+        results = await asyncio.gather(
+            *(manager.send_personal_message(message, user_id) for message, user_id in events),
+            return_exceptions=True
+        )
+        for (message, user_id), result in zip(events, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not notify user {user_id} of {message['type']}: {result}")
+
+
+lifecycle_scheduler = LifecycleScheduler(
+    interval=settings.LIFECYCLE_INTERVAL_SECONDS,
+    batch_size=settings.LIFECYCLE_BATCH_SIZE,
+    pooling_timeout_minutes=settings.POOLING_REQUEST_TIMEOUT_MINUTES,
+)
@@ -0,0 +1,74 @@
+# backend/app/services/message_archiver.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.database import session_scope
+from app.services import message_service
+
+logger = logging.getLogger(__name__)
+
+
+class MessageArchiver:
+    """
+    Background job that keeps `messages` small. Every `interval` seconds it
+    moves messages older than `hot_days` to `messages_archive`, a batch per
+    transaction, until none are left. History reads continue into the archive
+    on their own (see message_service.get_messages_for_conversation).
+    """
+
+    def __init__(self, hot_days: int, interval: float, batch_size: int):
+        self.hot_days = hot_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"runs": 0, "archived": 0, "failed_runs": 0}
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.archive_once()
+            except Exception as e:
+                logger.error(f"Message archival failed: {e}")
+                self.stats["failed_runs"] += 1
+            await asyncio.sleep(self.interval)
+
+    async def archive_once(self) -> int:
+        """Archives everything currently past the hot window. Returns how many messages moved."""
+        cutoff = datetime.utcnow() - timedelta(days=self.hot_days)
+        moved = 0
+        while True:
+            batch = await run_in_threadpool(self._archive_batch, cutoff)
+            moved += batch
+            if batch < self.batch_size:
+                break
+
+        self.stats["runs"] += 1
+        self.stats["archived"] += moved
+        if moved:
+            logger.info(f"Archived {moved} messages older than {cutoff.isoformat()}")
+        return moved
+
+    def _archive_batch(self, cutoff: datetime) -> int:
+        with session_scope() as db:
+            return message_service.archive_messages_before(db, cutoff, self.batch_size)
+
+
+message_archiver = MessageArchiver(
+    hot_days=settings.MESSAGE_HOT_DAYS,
+    interval=settings.MESSAGE_ARCHIVE_INTERVAL_MINUTES * 60,
+    batch_size=settings.MESSAGE_ARCHIVE_BATCH_SIZE,
+)
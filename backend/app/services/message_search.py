@@ -0,0 +1,275 @@
+# backend/app/services/message_search.py
+
+import base64
+import html
+import math
+import re
+import threading
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Numeric, and_, cast, func, or_
+from sqlalchemy.orm import Session, contains_eager, joinedload
+
+from app.models import user_model, message_model, conversation_model
+
+HIGHLIGHT_START = "<b>"
+HIGHLIGHT_STOP = "</b>"
+# Ranks are rounded so they survive the round trip through a cursor exactly
+RANK_PRECISION = 6
+# Words of context kept around the first match in a fallback snippet
+SNIPPET_WORDS = 20
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def encode_search_cursor(rank: Decimal, message_id: int) -> str:
+    raw = f"{rank}|{message_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> Tuple[Decimal, int]:
+    try:
+        rank, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return Decimal(rank), int(message_id)
+    except (ValueError, UnicodeDecodeError, InvalidOperation):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class InvertedIndex:
+    """
+    In-process inverted index over message content, used when the database has
+    no full-text search of its own (e.g. SQLite in local runs). It catches up
+    with the messages and messages_archive tables incrementally on each search.
+    Archived messages keep their ids, so each message is indexed once.
+
+    Scoring is BM25, so results rank roughly like they would under ts_rank.
+    Every query term has to match.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        # term -> {message_id: term frequency}
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.doc_lengths: Dict[int, int] = {}
+        self.conversation_of: Dict[int, int] = {}
+        self.total_length = 0
+        self.last_indexed_id = 0
+        self.last_archived_id = 0
+        self._lock = threading.Lock()
+
+    def add(self, message_id: int, conversation_id: int, content: str):
+        if message_id in self.doc_lengths:
+            return
+        tokens = tokenize(content)
+        for token in tokens:
+            postings = self.postings[token]
+            postings[message_id] = postings.get(message_id, 0) + 1
+        self.doc_lengths[message_id] = len(tokens)
+        self.conversation_of[message_id] = conversation_id
+        self.total_length += len(tokens)
+
+    def refresh(self, db: Session):
+        """Indexes messages written or archived since the last refresh."""
+        Message = message_model.Message
+        ArchivedMessage = message_model.ArchivedMessage
+        with self._lock:
+            rows = db.query(Message.id, Message.conversation_id, Message.content).filter(
+                Message.id > self.last_indexed_id
+            ).order_by(Message.id).yield_per(1000)
+            for message_id, conversation_id, content in rows:
+                self.add(message_id, conversation_id, content)
+                self.last_indexed_id = message_id
+            # Mostly already indexed while hot; this catches messages archived
+            # before this process started, or before a refresh saw them
+            rows = db.query(ArchivedMessage.id, ArchivedMessage.conversation_id, ArchivedMessage.content).filter(
+                ArchivedMessage.id > self.last_archived_id
+            ).order_by(ArchivedMessage.id).yield_per(1000)
+            for message_id, conversation_id, content in rows:
+                self.add(message_id, conversation_id, content)
+                self.last_archived_id = message_id
+
+    def search(self, terms: Iterable[str], conversation_ids: Set[int]) -> List[Tuple[Decimal, int]]:
+        """Returns (rank, message_id) for matching messages in `conversation_ids`, best first."""
+        terms = list(dict.fromkeys(terms))
+        with self._lock:
+            postings = [self.postings.get(term, {}) for term in terms]
+            if not postings or not all(postings):
+                return []
+
+            doc_count = len(self.doc_lengths)
+            average_length = self.total_length / doc_count or 1
+            # Walk the shortest posting list and probe the others
+            postings.sort(key=len)
+            results = []
+            for message_id in postings[0]:
+                if self.conversation_of[message_id] not in conversation_ids:
+                    continue
+                if not all(message_id in other for other in postings[1:]):
+                    continue
+                length_norm = self.K1 * (1 - self.B + self.B * self.doc_lengths[message_id] / average_length)
+                score = 0.0
+                for term_postings in postings:
+                    tf = term_postings[message_id]
+                    idf = math.log(1 + (doc_count - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+                    score += idf * tf * (self.K1 + 1) / (tf + length_norm)
+                results.append((round(Decimal(score), RANK_PRECISION), message_id))
+
+        results.sort(reverse=True)
+        return results
+
+
+fallback_index = InvertedIndex()
+
+
+def _escape(text: str) -> str:
+    return html.escape(text, quote=False)
+
+
+def _highlight_word(word: str, terms: Set[str]) -> str:
+    """`word`, HTML-escaped, with its matching tokens wrapped."""
+    pieces = []
+    end = 0
+    for m in _TOKEN.finditer(word):
+        pieces.append(_escape(word[end:m.start()]))
+        token = _escape(m.group(0))
+        pieces.append(f"{HIGHLIGHT_START}{token}{HIGHLIGHT_STOP}" if m.group(0).lower() in terms else token)
+        end = m.end()
+    pieces.append(_escape(word[end:]))
+    return "".join(pieces)
+
+
+def highlight(content: str, terms: Set[str]) -> str:
+    """
+    Snippet of `content` around the first match with matching words wrapped, like
+    ts_headline. The content is HTML-escaped, so the highlight tags are the only markup.
+    """
+    words = content.split()
+    matches = [i for i, word in enumerate(words) if set(tokenize(word)) & terms]
+    start = max(0, matches[0] - SNIPPET_WORDS // 2) if matches else 0
+    window = words[start:start + SNIPPET_WORDS]
+    return " ".join(_highlight_word(word, terms) for word in window)
+
+
+def _html_escaped(column):
+    """SQL for `column` HTML-escaped like _escape (ampersands first)."""
+    escaped = column
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;")):
+        escaped = func.replace(escaped, char, entity)
+    return escaped
+
+
+def search_messages(
+    db: Session,
+    user: user_model.User,
+    q: str,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> dict:
+    """
+    Full-text search over messages in the user's conversations, including
+    archived ones, best match first. Results are Message or ArchivedMessage
+    rows. Returns {"results": [(message, rank, snippet)], "next_cursor": ...}; pass
+    `next_cursor` back as `cursor` for the next page. Pages are keyed on
+    (rank, id), so they stay stable while new messages arrive.
+    """
+    if not tokenize(q):
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    after = decode_search_cursor(cursor) if cursor else None
+
+    if db.get_bind().dialect.name == "postgresql":
+        hits = _search_postgres(db, user, q, after, limit + 1)
+    else:
+        hits = _search_fallback(db, user, q, after, limit + 1)
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        last_message, last_rank, _ = hits[-1]
+        next_cursor = encode_search_cursor(last_rank, last_message.id)
+    return {"results": hits, "next_cursor": next_cursor}
+
+
+def _message_query(db: Session, user: user_model.User, model=message_model.Message):
+    """Query for `model` (Message or ArchivedMessage) rows in the user's conversations."""
+    Conversation = conversation_model.Conversation
+    return db.query(model).join(
+        Conversation, model.conversation_id == Conversation.id
+    ).options(
+        joinedload(model.sender),
+        contains_eager(model.conversation)
+    ).filter(
+        or_(Conversation.user1_id == user.id, Conversation.user2_id == user.id)
+    )
+
+
+def _search_postgres(db, user, q, after, limit):
+    config = message_model.TEXT_SEARCH_CONFIG
+    tsquery = func.websearch_to_tsquery(config, q)
+    hits = []
+    # Each table is searched through its own GIN index; ids are unique across
+    # both, so merging on (rank, id) keeps the cursor order.
+    for model, content_tsvector in (
+        (message_model.Message, message_model.content_tsvector),
+        (message_model.ArchivedMessage, message_model.archived_content_tsvector),
+    ):
+        rank = func.round(cast(func.ts_rank(content_tsvector, tsquery), Numeric), RANK_PRECISION)
+        # Escaped before highlighting so the StartSel/StopSel tags are the only markup
+        snippet = func.ts_headline(
+            config, _html_escaped(model.content), tsquery,
+            f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords={SNIPPET_WORDS}, MinWords=5"
+        )
+
+        query = _message_query(db, user, model).add_columns(rank, snippet).filter(
+            content_tsvector.op("@@")(tsquery)
+        )
+        if after:
+            after_rank, after_id = after
+            query = query.filter(or_(rank < after_rank, and_(rank == after_rank, model.id < after_id)))
+        rows = query.order_by(rank.desc(), model.id.desc()).limit(limit).all()
+        hits.extend((message, message_rank, message_snippet) for message, message_rank, message_snippet in rows)
+
+    hits.sort(key=lambda hit: (hit[1], hit[0].id), reverse=True)
+    return hits[:limit]
+
+
+def _search_fallback(db, user, q, after, limit):
+    Conversation = conversation_model.Conversation
+    fallback_index.refresh(db)
+    conversation_ids = {
+        conversation_id for (conversation_id,) in db.query(Conversation.id).filter(
+            or_(Conversation.user1_id == user.id, Conversation.user2_id == user.id)
+        )
+    }
+
+    terms = tokenize(q)
+    ranked = fallback_index.search(terms, conversation_ids)
+    if after:
+        ranked = [hit for hit in ranked if hit < after]
+
+    # Load candidates a page at a time, skipping ids found in neither table
+    # (e.g. deleted since indexing), so the page still fills up
+    hits = []
+    for start in range(0, len(ranked), limit):
+        window = ranked[start:start + limit]
+        window_ids = [message_id for _, message_id in window]
+        messages = {}
+        for model in (message_model.Message, message_model.ArchivedMessage):
+            messages.update(
+                (message.id, message)
+                for message in _message_query(db, user, model).filter(model.id.in_(window_ids))
+            )
+        for rank, message_id in window:
+            if message_id in messages:
+                hits.append((messages[message_id], rank, highlight(messages[message_id].content, set(terms))))
+        if len(hits) >= limit:
+            break
+    return hits[:limit]
@@ -1,15 +1,140 @@
 # backend/app/services/message_service.py
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
-from typing import List
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import or_, and_, func, insert, select, tuple_, update
+from typing import List, Optional, Tuple
 from fastapi import HTTPException
-from datetime import datetime
+from datetime import datetime, timedelta
+import base64
 
+from app.core.config import settings
 from app.models import user_model, message_model, conversation_model
 from app.schemas import message_schema
 from app.services import conversation_service
 
+# Length of the last-message snippet stored on the conversation
+PREVIEW_LENGTH = 200
+
+# Conversation changes are found by updated_at, and message ids and created_at
+# are assigned before the writing transaction commits, so a message can become
+# visible after a later id was already synced. Syncs look back this far past
+# the cursor so nothing committed just after the previous sync is missed; the
+# client treats conversation entries as state and dedupes messages by id, so
+# seeing one twice is harmless.
+SYNC_OVERLAP_SECONDS = 5
+
+def _update_conversation_summary(
+    db: Session,
+    conversation: conversation_model.Conversation,
+    last_message: message_model.Message,
+    unread_for_user1: int,
+    unread_for_user2: int
+):
+    """
+    Records the latest message on the conversation and bumps the unread counters.
+    Counters are incremented in SQL so concurrent writers don't lose updates.
+    """
+    Conversation = conversation_model.Conversation
+    db.query(Conversation).filter(Conversation.id == conversation.id).update({
+        Conversation.last_message_id: last_message.id,
+        Conversation.last_message_at: last_message.created_at,
+        Conversation.last_message_sender_id: last_message.sender_id,
+        Conversation.last_message_preview: last_message.content[:PREVIEW_LENGTH],
+        Conversation.user1_unread_count: Conversation.user1_unread_count + unread_for_user1,
+        Conversation.user2_unread_count: Conversation.user2_unread_count + unread_for_user2,
+    }, synchronize_session=False)
+
+
+def _unread_count(conversation: conversation_model.Conversation, user_id: int) -> int:
+    if conversation.user1_id == user_id:
+        return conversation.user1_unread_count
+    return conversation.user2_unread_count
+
+
+def _advance_read_watermark(db: Session, conversation: conversation_model.Conversation, user_id: int) -> bool:
+    """
+    Marks everything up to the conversation's last message as read by `user_id`.
+    This is a single-row update on `conversations`; the watermark and the unread
+    counter move together in one statement, so a message written concurrently is
+    either covered by both or by neither. Nothing is written if the user is
+    already caught up. Returns whether the watermark moved.
+    """
+    Conversation = conversation_model.Conversation
+    if conversation.user1_id == user_id:
+        watermark, unread = Conversation.user1_last_read_message_id, Conversation.user1_unread_count
+    else:
+        watermark, unread = Conversation.user2_last_read_message_id, Conversation.user2_unread_count
+
+    if conversation.last_message_id is None:
+        return False
+    updated = db.query(Conversation).filter(
+        Conversation.id == conversation.id,
+        watermark < Conversation.last_message_id
+    ).update({
+        watermark: Conversation.last_message_id,
+        unread: 0,
+    }, synchronize_session=False)
+    return updated > 0
+
+
+def recount_conversation_summaries(db: Session) -> int:
+    """
+    Recomputes every conversation's last-message summary and unread counters
+    from `messages`, for databases that predate them. The counters count the
+    partner's messages past each side's read watermark. Returns how many
+    conversations were updated; the caller commits.
+    """
+    Conversation = conversation_model.Conversation
+    Message = message_model.Message
+
+    latest = select(
+        Message.conversation_id,
+        Message.id,
+        Message.created_at,
+        Message.sender_id,
+        Message.content,
+        func.row_number().over(
+            partition_by=Message.conversation_id, order_by=Message.id.desc()
+        ).label("recency"),
+    ).subquery()
+    counts = select(
+        Message.conversation_id,
+        func.count().filter(and_(
+            Message.sender_id == Conversation.user2_id,
+            Message.id > Conversation.user1_last_read_message_id
+        )).label("user1_unread"),
+        func.count().filter(and_(
+            Message.sender_id == Conversation.user1_id,
+            Message.id > Conversation.user2_last_read_message_id
+        )).label("user2_unread"),
+    ).join(Conversation, Conversation.id == Message.conversation_id).group_by(Message.conversation_id).subquery()
+
+    result = db.execute(
+        update(Conversation).where(
+            Conversation.id == latest.c.conversation_id,
+            latest.c.recency == 1,
+            Conversation.id == counts.c.conversation_id
+        ).values({
+            Conversation.last_message_id: latest.c.id,
+            Conversation.last_message_at: latest.c.created_at,
+            Conversation.last_message_sender_id: latest.c.sender_id,
+            Conversation.last_message_preview: func.substr(latest.c.content, 1, PREVIEW_LENGTH),
+            Conversation.user1_unread_count: counts.c.user1_unread,
+            Conversation.user2_unread_count: counts.c.user2_unread,
+            # Not a new message; keep onupdate from bumping it
+            Conversation.updated_at: Conversation.updated_at,
+        })
+    )
+    return result.rowcount
+
+
+def is_message_read(conversation: conversation_model.Conversation, message: message_model.Message) -> bool:
+    """Whether the receiver of `message` has read it, per their read watermark."""
+    if message.sender_id == conversation.user1_id:
+        return message.id <= conversation.user2_last_read_message_id
+    return message.id <= conversation.user1_last_read_message_id
+
+
 def create_message(
     db: Session,
     sender: user_model.User,
@@ -39,22 +164,128 @@ def create_message(
     )
     
     db.add(message)
+    db.flush()
+
+    sent_by_user1 = conversation.user1_id == sender.id
+    _update_conversation_summary(
+        db, conversation, message,
+        unread_for_user1=0 if sent_by_user1 else 1,
+        unread_for_user2=1 if sent_by_user1 else 0
+    )
     db.commit()
     db.refresh(message)
     
     return message
 
 
+def create_messages_bulk(
+    db: Session,
+    entries: List[Tuple[int, int, str, datetime]]
+) -> List[dict | HTTPException]:
+    """
+    Persists chat messages from many senders in a single transaction.
+    `entries` are (sender_id, receiver_id, content, created_at) tuples.
+    Returns, in order, a plain dict for each stored message or an HTTPException
+    for entries that were rejected.
+    """
+    receiver_ids = {receiver_id for _, receiver_id, _, _ in entries}
+    known_users = {
+        user_id for (user_id,) in db.query(user_model.User.id).filter(user_model.User.id.in_(receiver_ids))
+    }
+
+    results: List[dict | HTTPException | message_model.Message] = []
+    pairs = set()
+    for sender_id, receiver_id, content, created_at in entries:
+        if receiver_id not in known_users:
+            results.append(HTTPException(status_code=404, detail="Receiver not found"))
+        else:
+            pairs.add((sender_id, receiver_id))
+            results.append(None)
+
+    conversations = conversation_service.find_or_create_conversations(db, pairs)
+
+    new_messages = []
+    # conversation id -> [conversation, last message, unread for user1, unread for user2]
+    summaries = {}
+    for i, (sender_id, receiver_id, content, created_at) in enumerate(entries):
+        if results[i] is not None:
+            continue
+        conversation = conversations[(min(sender_id, receiver_id), max(sender_id, receiver_id))]
+        message = message_model.Message(
+            conversation_id=conversation.id,
+            sender_id=sender_id,
+            content=content,
+            created_at=created_at
+        )
+        results[i] = message
+        new_messages.append(message)
+
+        summary = summaries.setdefault(conversation.id, [conversation, None, 0, 0])
+        summary[1] = message
+        if sender_id == conversation.user1_id:
+            summary[3] += 1
+        else:
+            summary[2] += 1
+
+    db.add_all(new_messages)
+    db.flush()
+
+    # One summary update per conversation touched by the batch
+    for conversation, last_message, unread_for_user1, unread_for_user2 in summaries.values():
+        _update_conversation_summary(db, conversation, last_message, unread_for_user1, unread_for_user2)
+
+    # Read everything we need before the commit expires the instances.
+    results = [
+        {
+            "id": r.id,
+            "conversation_id": r.conversation_id,
+            "sender_id": r.sender_id,
+            "content": r.content,
+            "created_at": r.created_at,
+            "is_read": False,
+        } if isinstance(r, message_model.Message) else r
+        for r in results
+    ]
+    db.commit()
+
+    return results
+
+
+def encode_message_cursor(message: message_model.Message) -> str:
+    """Opaque cursor for a message's position in its conversation's history."""
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_message_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 def get_messages_for_conversation(
     db: Session,
     user: user_model.User,
     conversation_id: int,
-    limit: int = 100
-) -> List[message_model.Message]:
+    limit: int = 100,
+    before: Optional[str] = None,
+    after: Optional[str] = None
+) -> Tuple[conversation_model.Conversation, List[message_model.Message], bool]:
     """
-    Get all messages for a conversation.
+    Get a page of messages for a conversation, oldest first, and whether more
+    messages exist in the requested direction. The conversation is returned too,
+    for its read watermarks (see is_message_read).
+    Without a cursor returns the newest `limit` messages; `before` pages towards
+    older messages and `after` towards newer ones. Pages are keyed on
+    (created_at, id), so each is a range scan of the conversation's index no
+    matter how long the history is.
     Validates that the user is part of the conversation.
     """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either 'before' or 'after', not both")
+
     # Verify the conversation exists and user is part of it
     conversation = db.query(conversation_model.Conversation).filter(
         conversation_model.Conversation.id == conversation_id
@@ -66,25 +297,93 @@ def get_messages_for_conversation(
     # Check if user is part of this conversation
     if conversation.user1_id != user.id and conversation.user2_id != user.id:
         raise HTTPException(status_code=403, detail="You are not part of this conversation")
+
+    # Opening the chat reads it, unless the user is only scrolling back through history
+    if not before and _advance_read_watermark(db, conversation, user.id):
+        db.commit()
+        db.refresh(conversation)
     
-    # Get messages
-    messages = db.query(message_model.Message).options(
-        joinedload(message_model.Message.sender)
-    ).filter(
-        message_model.Message.conversation_id == conversation_id
-    ).order_by(
-        message_model.Message.created_at.asc()
-    ).limit(limit).all()
+    # Get messages. Recent history is in `messages`; older pages continue
+    # into `messages_archive` once the hot table runs out.
+    before_position = decode_message_cursor(before) if before else None
+    after_position = decode_message_cursor(after) if after else None
+    # One extra row tells us whether there is another page
+    wanted = limit + 1
+
+    if after_position:
+        messages = []
+        if _may_be_archived(after_position[0]):
+            messages = _history_page(db, message_model.ArchivedMessage, conversation_id, None, after_position, wanted)
+        if len(messages) < wanted:
+            messages += _history_page(db, message_model.Message, conversation_id, None, after_position, wanted - len(messages))
+    else:
+        messages = _history_page(db, message_model.Message, conversation_id, before_position, None, wanted)
+        if len(messages) < wanted:
+            archive_before = (messages[-1].created_at, messages[-1].id) if messages else before_position
+            messages += _history_page(db, message_model.ArchivedMessage, conversation_id, archive_before, None, wanted - len(messages))
+
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if not after:
+        messages.reverse()
     
-    # Mark messages as read
-    db.query(message_model.Message).filter(
-        message_model.Message.conversation_id == conversation_id,
-        message_model.Message.sender_id != user.id,
-        message_model.Message.is_read == False
-    ).update({"is_read": True})
+    return conversation, messages, has_more
+
+
+def _history_page(db: Session, model, conversation_id: int, before, after, limit: int):
+    """
+    One keyset page of `model` (Message or ArchivedMessage), newest first, or
+    oldest first when paging `after` a position.
+    """
+    position = tuple_(model.created_at, model.id)
+    query = db.query(model).options(
+        joinedload(model.sender)
+    ).filter(
+        model.conversation_id == conversation_id
+    )
+    if after:
+        query = query.filter(position > after).order_by(model.created_at.asc(), model.id.asc())
+    else:
+        if before:
+            query = query.filter(position < before)
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    return query.limit(limit).all()
+
+
+def _may_be_archived(created_at: datetime) -> bool:
+    if settings.MESSAGE_HOT_DAYS <= 0:
+        return False
+    return created_at < datetime.utcnow() - timedelta(days=settings.MESSAGE_HOT_DAYS)
+
+
+def archive_messages_before(db: Session, cutoff: datetime, batch_size: int = 5000) -> int:
+    """
+    Moves up to `batch_size` messages created before `cutoff` from `messages` to
+    `messages_archive`, in one transaction. Returns how many were moved.
+    """
+    Message = message_model.Message
+    ArchivedMessage = message_model.ArchivedMessage
+
+    # SKIP LOCKED lets archivers on several workers share the backlog
+    ids = [
+        message_id for (message_id,) in db.query(Message.id).filter(
+            Message.created_at < cutoff
+        ).order_by(Message.id).limit(batch_size).with_for_update(skip_locked=True)
+    ]
+    if not ids:
+        db.rollback()
+        return 0
+
+    columns = ["id", "conversation_id", "sender_id", "content", "created_at"]
+    db.execute(
+        insert(ArchivedMessage).from_select(
+            columns,
+            select(*(getattr(Message, column) for column in columns)).where(Message.id.in_(ids))
+        )
+    )
+    db.query(Message).filter(Message.id.in_(ids)).delete(synchronize_session=False)
     db.commit()
-    
-    return messages
+    return len(ids)
 
 
 def mark_messages_as_read(
@@ -93,14 +392,18 @@ def mark_messages_as_read(
     conversation_id: int
 ) -> int:
     """
-    Mark all messages from the other user as read.
-    Returns the count of messages marked.
+    Mark all messages from the other user as read by advancing the user's
+    read watermark. Returns the count of messages marked.
     """
-    count = db.query(message_model.Message).filter(
-        message_model.Message.conversation_id == conversation_id,
-        message_model.Message.sender_id != user.id,
-        message_model.Message.is_read == False
-    ).update({"is_read": True})
+    conversation = conversation_service.get_conversation_by_id(db, conversation_id)
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    if conversation.user1_id != user.id and conversation.user2_id != user.id:
+        raise HTTPException(status_code=403, detail="You are not part of this conversation")
+
+    count = _unread_count(conversation, user.id)
+    if not _advance_read_watermark(db, conversation, user.id):
+        return 0
     db.commit()
     
     return count
@@ -108,62 +411,169 @@ def mark_messages_as_read(
 
 def get_recent_conversations(
     db: Session,
-    user: user_model.User
+    user: user_model.User,
+    skip: int = 0,
+    limit: int = 100
 ):
     """
-    Get all recent conversations for a user with the last message and unread count.
-    Returns conversations where user is involved with their latest message.
+    Get recent conversations for a user with the last message and unread count.
+    Reads only the denormalized summaries on `conversations`: each side of the
+    pair is an ordered scan of its (userN_id, last_message_at, id) index, and the two
+    are merged, so `messages` is never touched.
     """
-    # Get all conversations for this user
-    conversations = db.query(conversation_model.Conversation).options(
-        joinedload(conversation_model.Conversation.user1).joinedload(user_model.User.profile),
-        joinedload(conversation_model.Conversation.user2).joinedload(user_model.User.profile)
+    Conversation = conversation_model.Conversation
+    window = skip + limit
+
+    def side(user_column):
+        return select(Conversation.id, Conversation.last_message_at).where(
+            user_column == user.id
+        ).order_by(
+            Conversation.last_message_at.desc().nulls_last(), Conversation.id.desc()
+        ).limit(window).subquery()
+
+    as_user1, as_user2 = side(Conversation.user1_id), side(Conversation.user2_id)
+    candidates = select(as_user1.c.id, as_user1.c.last_message_at).union_all(
+        select(as_user2.c.id, as_user2.c.last_message_at)
+    ).subquery()
+    page_ids = select(candidates.c.id).order_by(
+        candidates.c.last_message_at.desc().nulls_last(), candidates.c.id.desc()
+    ).offset(skip).limit(limit)
+
+    conversations = db.query(Conversation).options(
+        joinedload(Conversation.user1).joinedload(user_model.User.profile),
+        joinedload(Conversation.user2).joinedload(user_model.User.profile)
     ).filter(
-        (conversation_model.Conversation.user1_id == user.id) |
-        (conversation_model.Conversation.user2_id == user.id)
+        Conversation.id.in_(page_ids)
+    ).order_by(
+        Conversation.last_message_at.desc().nulls_last(), Conversation.id.desc()
     ).all()
-    
-    result = []
-    for conv in conversations:
-        # Get the partner (the other user in the conversation)
-        if conv.user1_id == user.id:
-            partner = conv.user2
-        else:
-            partner = conv.user1
-        
-        # Get last message for this conversation
-        last_message = db.query(message_model.Message).filter(
-            message_model.Message.conversation_id == conv.id
-        ).order_by(
-            message_model.Message.created_at.desc()
-        ).first()
-        
-        # Count unread messages from partner
-        unread_count = db.query(message_model.Message).filter(
-            message_model.Message.conversation_id == conv.id,
-            message_model.Message.sender_id == partner.id,
-            message_model.Message.is_read == False
-        ).count()
-        
-        result.append({
-            "conversation_id": conv.id,
-            "partner": {
-                "id": partner.id,
-                "full_name": partner.full_name,
-                "phone_number": partner.profile.phone_number if partner.profile else None,
-                "email": partner.email,
-                "year_of_study": partner.profile.year_of_study if partner.profile else None,
-                "bio": partner.profile.bio if partner.profile else None,
-            },
-            "last_message": {
-                "content": last_message.content if last_message else None,
-                "created_at": last_message.created_at.isoformat() if last_message else None,
-                "sender_id": last_message.sender_id if last_message else None
-            } if last_message else None,
-            "unread_count": unread_count
-        })
-    
-    # Sort by last message time (most recent first)
-    result.sort(key=lambda x: x["last_message"]["created_at"] if x["last_message"] else "", reverse=True)
-    
-    return result
+
+    return [_conversation_summary(conv, user) for conv in conversations]
+
+
+def _conversation_summary(conv: conversation_model.Conversation, user: user_model.User) -> dict:
+    """Inbox entry for `conv` as seen by `user`. Expects partners' profiles to be loaded."""
+    # Get the partner (the other user in the conversation)
+    if conv.user1_id == user.id:
+        partner = conv.user2
+        unread_count = conv.user1_unread_count
+        last_read_message_id = conv.user1_last_read_message_id
+        partner_last_read_message_id = conv.user2_last_read_message_id
+    else:
+        partner = conv.user1
+        unread_count = conv.user2_unread_count
+        last_read_message_id = conv.user2_last_read_message_id
+        partner_last_read_message_id = conv.user1_last_read_message_id
+
+    return {
+        "conversation_id": conv.id,
+        "partner": {
+            "id": partner.id,
+            "full_name": partner.full_name,
+            "phone_number": partner.profile.phone_number if partner.profile else None,
+            "email": partner.email,
+            "year_of_study": partner.profile.year_of_study if partner.profile else None,
+            "bio": partner.profile.bio if partner.profile else None,
+        },
+        "last_message": {
+            "content": conv.last_message_preview,
+            "created_at": conv.last_message_at.isoformat(),
+            "sender_id": conv.last_message_sender_id
+        } if conv.last_message_at else None,
+        "unread_count": unread_count,
+        "last_read_message_id": last_read_message_id,
+        "partner_last_read_message_id": partner_last_read_message_id
+    }
+
+
+def encode_sync_cursor(synced_at: datetime, last_message_id: int, draining: bool = False) -> str:
+    raw = f"{synced_at.isoformat()}|{last_message_id}"
+    if draining:
+        raw += "|more"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_sync_cursor(cursor: str) -> Tuple[datetime, int, bool]:
+    # Same layout as a message cursor, plus a marker while the previous call
+    # still had messages to give (its overlap has been re-scanned already)
+    try:
+        synced_at, last_message_id, *marker = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if marker not in ([], ["more"]):
+            raise ValueError(cursor)
+        return datetime.fromisoformat(synced_at), int(last_message_id), bool(marker)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def get_changes_since(
+    db: Session,
+    user: user_model.User,
+    since: Optional[str] = None,
+    limit: int = 500
+) -> dict:
+    """
+    Everything that changed in the user's chats since `since`, across all
+    conversations: new messages (oldest first, at most `limit`) and the current
+    summary of every conversation whose summary or read watermarks changed.
+    Returns the changes plus a cursor for the next call; when `has_more` is set,
+    call again straight away with that cursor to get the rest of the messages.
+    Without `since` no changes are returned, only a cursor for "now", to be
+    taken right before the client's initial full load.
+    """
+    Message = message_model.Message
+    Conversation = conversation_model.Conversation
+    now = datetime.utcnow()
+    is_participant = or_(Conversation.user1_id == user.id, Conversation.user2_id == user.id)
+
+    if since is None:
+        last_message_id = db.query(func.max(Message.id)).scalar() or 0
+        return {
+            "messages": [],
+            "conversations": [],
+            "cursor": encode_sync_cursor(now, last_message_id),
+            "has_more": False,
+        }
+
+    synced_at, last_message_id, draining = decode_sync_cursor(since)
+    overlap_start = synced_at - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+
+    if draining:
+        # Paging on through the rest of a sync that already covered the overlap
+        is_new = Message.id > last_message_id
+    else:
+        # Also re-scan recent messages, in case one with a lower id than the
+        # cursor committed after the previous sync read past it
+        is_new = or_(Message.id > last_message_id, Message.created_at >= overlap_start)
+
+    messages = db.query(Message).join(
+        Conversation, Message.conversation_id == Conversation.id
+    ).options(
+        joinedload(Message.sender),
+        contains_eager(Message.conversation)
+    ).filter(
+        is_participant,
+        is_new
+    ).order_by(Message.id.asc()).limit(limit + 1).all()
+
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if messages:
+        # Re-scanned messages can sit below the cursor; only page from them
+        last_message_id = messages[-1].id if has_more else max(last_message_id, messages[-1].id)
+
+    conversations = db.query(Conversation).options(
+        joinedload(Conversation.user1).joinedload(user_model.User.profile),
+        joinedload(Conversation.user2).joinedload(user_model.User.profile)
+    ).filter(
+        is_participant,
+        Conversation.updated_at >= overlap_start
+    ).all()
+
+    return {
+        "messages": messages,
+        "conversations": [_conversation_summary(conv, user) for conv in conversations],
+        # Until the messages are drained, keep the old time so conversation
+        # changes are picked up again on the final page.
+        "cursor": encode_sync_cursor(synced_at if has_more else now, last_message_id, draining=has_more),
+        "has_more": has_more,
+    }
@@ -0,0 +1,108 @@
+# backend/app/services/message_writer.py
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.database import session_scope
+from app.services import message_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingMessage:
+    sender_id: int
+    receiver_id: int
+    content: str
+    created_at: datetime
+    future: asyncio.Future
+
+
+class MessageWriteBehind:
+    """
+    Write-behind batcher for chat messages sent over the chat WebSocket.
+
+    Messages from every socket are queued and written every `flush_interval`
+    seconds as one multi-row insert and one commit, instead of one transaction
+    per message. `submit` resolves once the message is committed, with the
+    stored message (including its id) as a dict.
+    """
+
+    def __init__(self, flush_interval: float = 0.02, max_batch: int = 500):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: List[PendingMessage] = []
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"messages": 0, "batches": 0, "failed_batches": 0}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        while self._queue:
+            await self._flush()
+
+    async def submit(self, sender_id: int, receiver_id: int, content: str) -> dict:
+        """Queues a message and waits until it has been committed."""
+        # Started lazily so the batcher also works where the lifespan didn't run.
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append(PendingMessage(
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+            content=content,
+            created_at=datetime.utcnow(),
+            future=future,
+        ))
+        return await future
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            while self._queue:
+                await self._flush()
+
+    async def _flush(self):
+        batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+        entries = [(m.sender_id, m.receiver_id, m.content, m.created_at) for m in batch]
+
+        try:
+            results = await run_in_threadpool(self._write, entries)
+        except Exception as e:
+            logger.error(f"Chat write-behind batch of {len(batch)} failed: {e}")
+            self.stats["failed_batches"] += 1
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["messages"] += len(batch)
+        for pending, result in zip(batch, results):
+            if pending.future.done():
+                continue
+            if isinstance(result, Exception):
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
+
+    @staticmethod
+    def _write(entries):
+        with session_scope() as db:
+            return message_service.create_messages_bulk(db, entries)
+
+
+message_writer = MessageWriteBehind(
+    flush_interval=settings.WS_CHAT_FLUSH_MS / 1000,
+    max_batch=settings.WS_CHAT_MAX_BATCH,
+)
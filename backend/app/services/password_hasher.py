@@ -0,0 +1,179 @@
+# backend/app/services/password_hasher.py
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+import bcrypt
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def hash_password(password: str) -> str:
+    """bcrypt hash of `password`, computed in the calling process."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+# --- Run inside the pool's worker processes ---
+
+def _hash(password: str) -> Tuple[str, float]:
+    started = time.perf_counter()
+    hashed = hash_password(password)
+    return hashed, time.perf_counter() - started
+
+
+def _verify(plain_password: str, hashed_password: str) -> Tuple[bool, float]:
+    started = time.perf_counter()
+    matches = bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return matches, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a pool of `workers` processes, so hashing doesn't hold the
+    GIL. `hash()` and `verify()` are coroutines that await the worker's result,
+    so a waiting request holds neither the event loop nor a threadpool thread.
+    At most `workers + max_queue` calls are in flight; beyond that callers get
+    a 503 straight away instead of queueing behind a login burst. With
+    `workers=0` bcrypt runs in the request threadpool instead.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers > 0 else None
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._timings = {
+            op: {"count": 0, "total_ms": 0.0, "bcrypt_ms": 0.0, "max_ms": 0.0}
+            for op in ("hash", "verify")
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn: forking a process that runs an event loop and threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, _future=None):
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _record(self, op: str, started: float, bcrypt_seconds: float):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            timing = self._timings[op]
+            timing["count"] += 1
+            timing["total_ms"] += elapsed_ms
+            timing["bcrypt_ms"] += bcrypt_seconds * 1000
+            timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+
+    async def _run(self, op: str, fn, *args):
+        started = time.perf_counter()
+        if self._slots is None:
+            result, bcrypt_seconds = await run_in_threadpool(fn, *args)
+            self._record(op, started, bcrypt_seconds)
+            return result
+
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins right now, please try again",
+                headers={"Retry-After": "1"},
+            )
+        with self._stats_lock:
+            self._in_flight += 1
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._release()
+            self._discard_executor(executor)
+            logger.error(f"Password hashing pool unavailable: {e}")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Please try again")
+        # The slot stays taken until the worker is done, even if we stop waiting
+        future.add_done_callback(self._release)
+
+        try:
+            # shield: a timeout ends the wait, not the worker's job
+            result, bcrypt_seconds = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self._timed_out += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Please try again")
+        except BrokenProcessPool as e:
+            self._discard_executor(executor)
+            logger.error(f"Password hashing worker died: {e}")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Please try again")
+        self._record(op, started, bcrypt_seconds)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", _verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            timings = {}
+            for op, timing in self._timings.items():
+                count = timing["count"]
+                timings[op] = {
+                    "count": count,
+                    "avg_ms": round(timing["total_ms"] / count, 2) if count else 0.0,
+                    # Average time spent in bcrypt itself; the rest is queueing and IPC
+                    "avg_bcrypt_ms": round(timing["bcrypt_ms"] / count, 2) if count else 0.0,
+                    "max_ms": round(timing["max_ms"], 2),
+                }
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                **timings,
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+)
@@ -19,7 +19,7 @@ import httpx
 # Increased radius for easier testing, as requested.
 START_LOCATION_RADIUS_METERS = 5000  # 5km
 DESTINATION_RADIUS_METERS = 5000 # 5km
-ACTIVE_TIMEOUT_MINUTES = 15
+ACTIVE_TIMEOUT_MINUTES = settings.POOLING_REQUEST_TIMEOUT_MINUTES
 MAX_PENDING_CONNECTIONS = 5
 OLA_DISTANCE_MATRIX_BASIC_API_URL = "https://api.olamaps.io/routing/v1/distanceMatrix/basic"
 
@@ -121,6 +121,8 @@ async def find_matches(db: Session, new_request: pooling_model.PoolingRequest) -
     Finds matches, updates statuses, and notifies all parties via WebSocket.
     """
     print(f"\n--- Starting Match Search for Request ID: {new_request.id} (User: {new_request.user.id}) ---")
+    # The lifecycle scheduler cancels timed-out requests; this only covers the
+    # gap until its next run.
     time_threshold = datetime.utcnow() - timedelta(minutes=ACTIVE_TIMEOUT_MINUTES)
     
     potential_matches_from_db = db.query(pooling_model.PoolingRequest).options(
@@ -474,5 +476,40 @@ async def cancel_pooling_request(db: Session, request_id: int, user: user_model.
     # Cancel the request
     request.status = pooling_model.PoolingRequestStatus.CANCELLED
     db.commit()
-    
-    return {"message": "Request cancelled successfully"}
\ No newline at end of file
+
+    return {"message": "Request cancelled successfully"}
+
+
+def expire_pooling_requests(db: Session, cutoff: datetime, batch_size: int = 1000) -> List[tuple]:
+    """
+    Cancels up to `batch_size` ACTIVE or MATCHED requests created before `cutoff`,
+    and rejects their pending connection requests, in one transaction.
+    Returns (request id, user id) for each request cancelled.
+    """
+    PoolingRequest = pooling_model.PoolingRequest
+    PoolingConnection = pooling_model.PoolingConnection
+    waiting = [pooling_model.PoolingRequestStatus.ACTIVE, pooling_model.PoolingRequestStatus.MATCHED]
+
+    # SKIP LOCKED lets schedulers on several workers share the backlog
+    expired = db.query(PoolingRequest.id, PoolingRequest.user_id).filter(
+        PoolingRequest.status.in_(waiting),
+        PoolingRequest.created_at < cutoff
+    ).order_by(PoolingRequest.id).limit(batch_size).with_for_update(skip_locked=True).all()
+    if not expired:
+        db.rollback()
+        return []
+
+    request_ids = [request_id for request_id, _ in expired]
+    db.query(PoolingRequest).filter(
+        PoolingRequest.id.in_(request_ids),
+        PoolingRequest.status.in_(waiting)
+    ).update({"status": pooling_model.PoolingRequestStatus.CANCELLED}, synchronize_session=False)
+    db.query(PoolingConnection).filter(
+        or_(
+            PoolingConnection.sender_request_id.in_(request_ids),
+            PoolingConnection.receiver_request_id.in_(request_ids)
+        ),
+        PoolingConnection.status == pooling_model.PoolingConnectionStatus.PENDING
+    ).update({"status": pooling_model.PoolingConnectionStatus.REJECTED}, synchronize_session=False)
+    db.commit()
+    return [tuple(row) for row in expired]
\ No newline at end of file
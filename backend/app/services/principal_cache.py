@@ -0,0 +1,153 @@
+# backend/app/services/principal_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models import user_model
+from app.schemas import token_schema
+
+
+class PrincipalCache:
+    """
+    Per-worker caches for authentication, so most requests authenticate
+    without touching the database:
+
+    - decoded token claims, per token string, until the token expires;
+    - the users' column values, per token subject (email), for `ttl` seconds.
+
+    Both are bounded LRUs. Changes to a user made in this worker call
+    `invalidate()`, which only affects that user. Other workers don't hear of
+    it: `ttl` bounds how long a change made by another worker can go unseen.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # token -> (expires at as a unix timestamp or None, claims)
+        self._claims: "OrderedDict[str, Tuple[Optional[float], token_schema.TokenData]]" = OrderedDict()
+        # subject -> (stored_at, column values)
+        self._principals: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # user id -> subject, for invalidate()
+        self._subjects: Dict[int, str] = {}
+        # user id -> value of `invalidations` at the user's last invalidation.
+        # Users pushed out of this LRU count as invalidated at `_version_floor`.
+        self._versions: "OrderedDict[int, int]" = OrderedDict()
+        self._version_floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_claims(self, token: str) -> Optional[token_schema.TokenData]:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._claims.get(token)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._claims[token]
+                return None
+            self._claims.move_to_end(token)
+            return claims
+
+    def put_claims(self, token: str, expires_at: Optional[float], claims: token_schema.TokenData):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._claims[token] = (expires_at, claims)
+            self._claims.move_to_end(token)
+            while len(self._claims) > self.max_entries:
+                self._claims.popitem(last=False)
+
+    def get(self, subject: str) -> Optional[user_model.User]:
+        """
+        A detached User built from the cached columns, or None. Relationships
+        are not loaded; merge it into a session (load=False) to read them.
+        """
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._principals.get(subject)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+            self._principals.move_to_end(subject)
+            self.hits += 1
+            columns = entry[1]
+
+        user = user_model.User(**columns)
+        make_transient_to_detached(user)
+        return user
+
+    def version(self, user_id: Optional[int]) -> Tuple[Optional[int], int]:
+        """
+        Take this before loading a user and pass it to put(). Without the id
+        (tokens issued before it was added) an invalidation of any user makes
+        the load too old to cache.
+        """
+        with self._lock:
+            if user_id is None:
+                return None, self.invalidations
+            return user_id, self._versions.get(user_id, self._version_floor)
+
+    def put(self, user: user_model.User, version: Tuple[Optional[int], int]):
+        """
+        Stores a user loaded at `version` (see version()). It is dropped if the
+        user was invalidated while it was being loaded.
+        """
+        if self.max_entries <= 0:
+            return
+        columns = {attr.key: getattr(user, attr.key) for attr in inspect(user_model.User).column_attrs}
+        user_id, seen = version
+        with self._lock:
+            if user_id is None:
+                current = self.invalidations
+            else:
+                current = self._versions.get(user.id, self._version_floor)
+            if seen != current:
+                return
+            self._principals[user.email] = (time.monotonic(), columns)
+            self._principals.move_to_end(user.email)
+            self._subjects[user.id] = user.email
+            while len(self._principals) > self.max_entries:
+                evicted, (_, columns) = self._principals.popitem(last=False)
+                if self._subjects.get(columns["id"]) == evicted:
+                    del self._subjects[columns["id"]]
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            subject = self._subjects.pop(user_id, None)
+            if subject is not None:
+                self._principals.pop(subject, None)
+            self.invalidations += 1
+            self._versions[user_id] = self.invalidations
+            self._versions.move_to_end(user_id)
+            while len(self._versions) > max(self.max_entries, 1):
+                _, evicted_version = self._versions.popitem(last=False)
+                self._version_floor = max(self._version_floor, evicted_version)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "principals": len(self._principals),
+            "tokens": len(self._claims),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+)
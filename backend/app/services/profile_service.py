@@ -3,6 +3,7 @@ from fastapi import HTTPException, status
 
 from app.models import user_model, profile_model
 from app.schemas import profile_schema
+from app.services.principal_cache import principal_cache
 
 def get_user_profile(db: Session, user: user_model.User) -> dict:
     """
@@ -63,6 +64,7 @@ def update_user_profile(db: Session, user: user_model.User, profile_data: profil
     db.add(user)
     db.add(user_profile)
     db.commit()
+    principal_cache.invalidate(user.id)
     db.refresh(user)
     
     # Return the newly updated, combined profile
@@ -1,31 +1,86 @@
 # backend/app/services/service_service.py
 
-from sqlalchemy.orm import Session, joinedload, contains_eager
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, contains_eager, selectinload
+from sqlalchemy import func, literal_column, select, tuple_, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from typing import List, Optional, Tuple
+from datetime import datetime
+import base64
 from fastapi import HTTPException, status
 from app.models import user_model, service_model
 from app.schemas import service_schema
+from app.db.bulk import get_or_create_many
+from app.services.tag_index import tag_index
+from app.services.feed_cache import feed_cache
+from app.services import feed_ranking
 
 def get_or_create_tags(db: Session, tag_names: List[str]) -> List[service_model.Tag]:
     """
     Finds existing tags in the database from a list of names.
     If a tag does not exist, it creates a new one.
+    All tags are resolved together (see get_or_create_many); nothing is committed.
     """
-    tags = []
-    for name in tag_names:
-        name_lower = name.lower().strip()
-        if not name_lower:
-            continue
-            
-        tag = db.query(service_model.Tag).filter(service_model.Tag.name == name_lower).first()
-        
-        if not tag:
-            tag = service_model.Tag(name=name_lower)
-            db.add(tag)
-            db.commit()
-            db.refresh(tag)
-        tags.append(tag)
-    return tags
+    names = list(dict.fromkeys(name.lower().strip() for name in tag_names if name.strip()))
+    tags = get_or_create_many(db, service_model.Tag, ["name"], [{"name": name} for name in names])
+    return [tags[(name,)] for name in names]
+
+def search_vector(title, description, tag_text):
+    """
+    SQL expression for a post's weighted search document. Arguments can be plain
+    values or column expressions; `tag_text` is the tag names joined by spaces.
+    """
+    config = service_model.TEXT_SEARCH_CONFIG
+    return (
+        func.setweight(func.to_tsvector(config, title), literal_column("'A'"))
+        .op('||')(func.setweight(func.to_tsvector(config, tag_text), literal_column("'B'")))
+        .op('||')(func.setweight(func.to_tsvector(config, description), literal_column("'C'")))
+    )
+
+def _supports_text_search(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _refresh_search_vector(db: Session, post: service_model.ServicePost):
+    """
+    Recomputes a post's search_vector from its title, description and tags.
+    Every path that writes any of those has to call this before committing.
+    """
+    if _supports_text_search(db):
+        post.search_vector = search_vector(
+            post.title, post.description, " ".join(tag.name for tag in post.tags)
+        )
+
+def backfill_search_vectors(db: Session, batch_size: int = 1000) -> int:
+    """
+    Fills in search_vector for posts that have none (e.g. created before the
+    column existed), `batch_size` posts per transaction. Postgres only.
+    Returns how many posts were updated.
+    """
+    ServicePost = service_model.ServicePost
+    Tag = service_model.Tag
+    post_tags = service_model.service_post_tags
+    tag_text = func.coalesce(
+        select(func.string_agg(Tag.name, literal_column("' '"))).select_from(
+            post_tags.join(Tag, post_tags.c.tag_id == Tag.id)
+        ).where(post_tags.c.service_post_id == ServicePost.id).scalar_subquery(),
+        ""
+    )
+    total = 0
+    while True:
+        ids = select(ServicePost.id).where(
+            ServicePost.search_vector.is_(None)
+        ).order_by(ServicePost.id).limit(batch_size).scalar_subquery()
+        result = db.execute(
+            update(ServicePost).where(ServicePost.id.in_(ids)).values({
+                ServicePost.search_vector: search_vector(ServicePost.title, ServicePost.description, tag_text),
+                # Not an edit of the post; keep onupdate from bumping it
+                ServicePost.updated_at: ServicePost.updated_at,
+            })
+        )
+        db.commit()
+        if not result.rowcount:
+            return total
+        total += result.rowcount
 
 def create_service_post(
     db: Session, user: user_model.User, post_data: service_schema.ServicePostCreate
@@ -47,44 +102,118 @@ def create_service_post(
         is_anonymous=post_data.is_anonymous,
         tags=tags
     )
+    _refresh_search_vector(db, new_post)
     
     db.add(new_post)
+    feed_ranking.record_interest(db, user.id, [tag.id for tag in tags], feed_ranking.POST_WEIGHT)
     db.commit()
     db.refresh(new_post)
+    tag_index.add_post(new_post.id, [tag.name for tag in tags])
+    feed_cache.invalidate()
     
     return new_post
 
+def encode_feed_cursor(post: service_model.ServicePost) -> str:
+    """Opaque cursor for a post's position in the newest-first feed."""
+    raw = f"{post.created_at.isoformat()}|{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_feed_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>, with the statement's parameters bound as usual."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def _open_posts_query(db: Session, search: Optional[str], tag_names: List[str]):
+    """
+    Query over OPEN posts matching the search and tags, the ordering to use, and
+    the ids matching the tags (None without a tag filter).
+    """
+    ServicePost = service_model.ServicePost
+    query = db.query(ServicePost).filter(
+        ServicePost.status == service_model.ServiceStatus.OPEN
+    )
+
+    order_by = [ServicePost.created_at.desc(), ServicePost.id.desc()]
+    if search and _supports_text_search(db):
+        tsquery = func.websearch_to_tsquery(service_model.TEXT_SEARCH_CONFIG, search)
+        query = query.filter(ServicePost.search_vector.op('@@')(tsquery))
+        order_by.insert(0, func.ts_rank_cd(ServicePost.search_vector, tsquery).desc())
+    elif search:
+        # No full-text search on this database (e.g. SQLite in local runs)
+        search_term = f"%{search.lower()}%"
+        query = query.filter(
+            (ServicePost.title.ilike(search_term)) |
+            (ServicePost.description.ilike(search_term))
+        )
+
+    post_ids = None
+    if tag_names:
+        post_ids = tag_index.posts_with_all_tags(db, tag_names)
+    return query, order_by, post_ids
+
+def normalize_tags(tags: Optional[List[str]]) -> List[str]:
+    return [name.lower().strip() for name in tags or [] if name.strip()]
+
 def get_all_service_posts(
     db: Session, 
     skip: int = 0, 
     limit: int = 100,
     search: Optional[str] = None,
-    tags: Optional[List[str]] = None
+    tags: Optional[List[str]] = None,
+    cursor: Optional[str] = None
 ) -> List[service_model.ServicePost]:
     """
     Fetches a list of open service posts with optional search and tag filtering.
+    With a search, posts are ordered by relevance (title matches weigh most, then
+    tags, then description); otherwise newest first.
+    Without a search, pass `cursor` (see encode_feed_cursor) instead of `skip`
+    to page by keyset on (created_at, id), which costs the same on every page.
+    Tag filters are resolved against the in-memory tag index; the database only
+    loads the posts that end up on the page.
     """
-    query = db.query(service_model.ServicePost).options(
-        joinedload(service_model.ServicePost.poster),
-        joinedload(service_model.ServicePost.tags)
-    ).filter(
-        service_model.ServicePost.status == service_model.ServiceStatus.OPEN
-    )
+    ServicePost = service_model.ServicePost
+    query, order_by, post_ids = _open_posts_query(db, search, normalize_tags(tags))
 
-    if search:
-        search_term = f"%{search.lower()}%"
-        query = query.filter(
-            (service_model.ServicePost.title.ilike(search_term)) |
-            (service_model.ServicePost.description.ilike(search_term))
-        )
+    position = decode_feed_cursor(cursor) if cursor and not search else None
+    if position:
+        skip = 0
+        query = query.filter(tuple_(ServicePost.created_at, ServicePost.id) < position)
 
-    if tags:
-        for tag_name in tags:
-            query = query.filter(service_model.ServicePost.tags.any(name=tag_name.lower().strip()))
+    if post_ids is not None:
+        # Only without a search is the id list cut down to the page first. With
+        # one, the database has to rank every post carrying the tags, so the
+        # tags' whole posting list is still sent as IN (...); a very common tag
+        # makes that a long list.
+        if not search:
+            # Ids grow with created_at, so newest first is the list reversed
+            post_ids = post_ids[::-1]
+            if position:
+                post_ids = [post_id for post_id in post_ids if post_id < position[1]]
+            post_ids = post_ids[skip:skip + limit]
+            skip = 0
+        if not post_ids:
+            return []
+        query = query.filter(ServicePost.id.in_(post_ids))
 
-    posts = query.order_by(
-        service_model.ServicePost.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    # Tags and poster come from batched follow-up queries rather than joins, so
+    # the page query stays a plain index scan.
+    posts = query.options(
+        selectinload(ServicePost.poster),
+        selectinload(ServicePost.tags)
+    ).order_by(*order_by).offset(skip).limit(limit).all()
     
     for post in posts:
         if post.is_anonymous:
@@ -92,6 +221,74 @@ def get_all_service_posts(
             
     return posts
 
+def get_personalized_service_posts(
+    db: Session, user: user_model.User, skip: int = 0, limit: int = 20
+) -> List[service_model.ServicePost]:
+    """
+    The "for you" feed: open posts ranked by how well their tags match the
+    user's tag affinities (see feed_ranking), then the remaining posts newest
+    first. Leaves out the user's own posts and posts they already applied to.
+    """
+    ServicePost = service_model.ServicePost
+    seen = feed_ranking.seen_post_ids(db, user)
+    ranked = feed_ranking.rank_post_ids(db, user, skip + limit, exclude=seen)
+
+    posts = []
+    page_ids = ranked[skip:skip + limit]
+    if page_ids:
+        found = {
+            post.id: post for post in db.query(ServicePost).options(
+                selectinload(ServicePost.poster),
+                selectinload(ServicePost.tags)
+            ).filter(
+                ServicePost.id.in_(page_ids),
+                ServicePost.status == service_model.ServiceStatus.OPEN
+            )
+        }
+        posts = [found[post_id] for post_id in page_ids if post_id in found]
+
+    if len(posts) < limit:
+        # Past the ranked posts the feed continues chronologically. Also fills
+        # in for ranked posts that turned out not to be OPEN any more.
+        query = db.query(ServicePost).options(
+            selectinload(ServicePost.poster),
+            selectinload(ServicePost.tags)
+        ).filter(ServicePost.status == service_model.ServiceStatus.OPEN)
+        excluded = seen.union(ranked)
+        if excluded:
+            query = query.filter(ServicePost.id.notin_(excluded))
+        posts += query.order_by(
+            ServicePost.created_at.desc(), ServicePost.id.desc()
+        ).offset(max(0, skip - len(ranked))).limit(limit - len(posts)).all()
+
+    for post in posts:
+        if post.is_anonymous:
+            post.poster = None
+
+    return posts
+
+def estimate_open_service_posts(
+    db: Session,
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = None
+) -> int:
+    """
+    Approximate number of posts in the feed for this search/tag filter, for the
+    UI. On Postgres this is the planner's row estimate, which costs no scan.
+    Tag-only filters are counted exactly from the tag index.
+    """
+    query, _, post_ids = _open_posts_query(db, search, normalize_tags(tags))
+    if post_ids is not None:
+        if not search:
+            return len(post_ids)
+        query = query.filter(service_model.ServicePost.id.in_(post_ids))
+
+    if not _supports_text_search(db):
+        return query.count()
+
+    plan = db.execute(_Explain(query.with_entities(service_model.ServicePost.id).statement)).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
 def get_service_post_by_id(db: Session, post_id: int) -> service_model.ServicePost | None:
     """Fetches a single, detailed service post by its ID."""
     post = db.query(service_model.ServicePost).options(
@@ -117,8 +314,92 @@ def delete_service_post(db: Session, post_id: int, user: user_model.User):
 
     db.delete(post_to_delete)
     db.commit()
+    tag_index.remove_post(post_id)
+    feed_cache.invalidate()
     return
 
+def expire_service_posts(db: Session, now: datetime, batch_size: int = 1000) -> List[Tuple[int, int, str]]:
+    """
+    Cancels up to `batch_size` OPEN posts whose deadline is before `now`, in one
+    transaction. Returns (post id, poster id, title) for each post cancelled.
+    """
+    ServicePost = service_model.ServicePost
+
+    # SKIP LOCKED lets schedulers on several workers share the backlog
+    expired = db.query(ServicePost.id, ServicePost.poster_user_id, ServicePost.title).filter(
+        ServicePost.status == service_model.ServiceStatus.OPEN,
+        ServicePost.deadline < now
+    ).order_by(ServicePost.id).limit(batch_size).with_for_update(skip_locked=True).all()
+    if not expired:
+        db.rollback()
+        return []
+
+    db.query(ServicePost).filter(
+        ServicePost.id.in_([post_id for post_id, _, _ in expired]),
+        ServicePost.status == service_model.ServiceStatus.OPEN
+    ).update({
+        "status": service_model.ServiceStatus.CANCELLED,
+        "updated_at": now
+    }, synchronize_session=False)
+    db.commit()
+
+    for post_id, _, _ in expired:
+        tag_index.remove_post(post_id)
+    feed_cache.invalidate()
+    return [tuple(row) for row in expired]
+
+_APPLICATION_COUNTERS = {
+    service_model.ApplicationStatus.PENDING: "applications_pending",
+    service_model.ApplicationStatus.ACCEPTED: "applications_accepted",
+    service_model.ApplicationStatus.REJECTED: "applications_rejected",
+}
+
+def _bump_application_counters(db: Session, post_id: int, **deltas: int):
+    """
+    Adjusts a post's per-status application counters in SQL, e.g.
+    applications_pending=-1, applications_accepted=1, so concurrent
+    applications don't lose updates.
+    """
+    ServicePost = service_model.ServicePost
+    db.query(ServicePost).filter(ServicePost.id == post_id).update({
+        getattr(ServicePost, counter): getattr(ServicePost, counter) + delta
+        for counter, delta in deltas.items()
+    }, synchronize_session=False)
+
+def encode_application_cursor(application: service_model.ServiceApplication) -> str:
+    """Opaque cursor for an application's position in a post's newest-first applicant list."""
+    raw = f"{application.application_date.isoformat()}|{application.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_application_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        application_date, application_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(application_date), int(application_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def recount_application_counters(db: Session) -> int:
+    """
+    Recomputes every post's per-status application counters from
+    service_applications, for databases that predate the counters. Returns
+    how many posts were updated; the caller commits.
+    """
+    ServicePost = service_model.ServicePost
+    ServiceApplication = service_model.ServiceApplication
+    result = db.execute(
+        update(ServicePost).values({
+            getattr(ServicePost, counter): select(func.count(ServiceApplication.id)).where(
+                ServiceApplication.service_post_id == ServicePost.id,
+                ServiceApplication.status == application_status
+            ).scalar_subquery()
+            for application_status, counter in _APPLICATION_COUNTERS.items()
+        } | {
+            # Not an edit of the post; keep onupdate from bumping it
+            ServicePost.updated_at: ServicePost.updated_at
+        })
+    )
+    return result.rowcount
+
 def create_application_for_post(
     db: Session, post_id: int, user: user_model.User, app_data: service_schema.ServiceApplicationCreate
 ) -> service_model.ServiceApplication:
@@ -142,25 +423,41 @@ def create_application_for_post(
         **app_data.model_dump()
     )
     db.add(new_app)
+    _bump_application_counters(db, post_id, applications_pending=1)
+    feed_ranking.record_interest(db, user.id, [tag.id for tag in post.tags], feed_ranking.APPLICATION_WEIGHT)
     db.commit()
+    feed_cache.invalidate()
     db.refresh(new_app)
     return new_app
 
 def get_applications_for_post(
-    db: Session, post_id: int, user: user_model.User
+    db: Session, post_id: int, user: user_model.User,
+    limit: int = 50, cursor: Optional[str] = None
 ) -> List[service_model.ServiceApplication]:
-    """Gets all applications for a post. Only the post owner can access this."""
+    """
+    Gets a page of applications for a post, newest first. Only the post owner
+    can access this. Pass `cursor` (see encode_application_cursor) for the
+    page after a given application.
+    """
     post = db.query(service_model.ServicePost).filter(service_model.ServicePost.id == post_id).first()
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service post not found.")
     if post.poster_user_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view applications for this post.")
 
-    applications = db.query(service_model.ServiceApplication).options(
-        joinedload(service_model.ServiceApplication.applicant)
+    ServiceApplication = service_model.ServiceApplication
+    query = db.query(ServiceApplication).options(
+        joinedload(ServiceApplication.applicant)
     ).filter(
-        service_model.ServiceApplication.service_post_id == post_id
-    ).order_by(service_model.ServiceApplication.application_date.desc()).all()
+        ServiceApplication.service_post_id == post_id
+    )
+    if cursor:
+        query = query.filter(
+            tuple_(ServiceApplication.application_date, ServiceApplication.id) < decode_application_cursor(cursor)
+        )
+    applications = query.order_by(
+        ServiceApplication.application_date.desc(), ServiceApplication.id.desc()
+    ).limit(limit).all()
     return applications
 
 def update_application_status(
@@ -178,11 +475,19 @@ def update_application_status(
     if update_data.status not in [service_model.ApplicationStatus.ACCEPTED, service_model.ApplicationStatus.REJECTED]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Status can only be updated to 'accepted' or 'rejected'.")
 
+    if application.status != update_data.status:
+        _bump_application_counters(db, application.service_post_id, **{
+            _APPLICATION_COUNTERS[application.status]: -1,
+            _APPLICATION_COUNTERS[update_data.status]: 1,
+        })
     application.status = update_data.status
     
     if update_data.status == service_model.ApplicationStatus.ACCEPTED:
         application.service_post.status = service_model.ServiceStatus.IN_PROGRESS
 
     db.commit()
+    if update_data.status == service_model.ApplicationStatus.ACCEPTED:
+        tag_index.remove_post(application.service_post_id)
+    feed_cache.invalidate()
     db.refresh(application)
     return application
\ No newline at end of file
@@ -0,0 +1,145 @@
+# backend/app/services/tag_index.py
+
+import bisect
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import service_model
+
+
+def gallop_intersect(small: List[int], large: List[int]) -> List[int]:
+    """
+    Intersection of two sorted id lists. Each element of `small` is found in
+    `large` by galloping (doubling steps, then a binary search in the last
+    step), so the cost is O(len(small) * log(len(large))) rather than
+    O(len(small) + len(large)).
+    """
+    result = []
+    low = 0
+    n = len(large)
+    for value in small:
+        step = 1
+        high = low
+        while high < n and large[high] < value:
+            low = high + 1
+            high += step
+            step *= 2
+        low = bisect.bisect_left(large, value, low, min(high + 1, n))
+        if low == n:
+            break
+        if large[low] == value:
+            result.append(value)
+    return result
+
+
+class TagPostingIndex:
+    """
+    In-memory tag -> sorted post-id posting lists for OPEN service posts, so a
+    multi-tag filter becomes a list intersection instead of one EXISTS subquery
+    per tag.
+
+    This process keeps it current on create, delete and status change. It is
+    also rebuilt from the database after `max_age` seconds, which bounds how
+    stale it can get from changes made by other workers. Callers re-check
+    status when they load the posts, so a stale id only shortens a page.
+    """
+
+    def __init__(self, max_age: float = 60):
+        self.max_age = max_age
+        self._postings: Dict[str, List[int]] = {}
+        # post id -> its tag names, for removal
+        self._post_tags: Dict[int, List[str]] = {}
+        # post id -> 1 / sqrt(number of tags), the weight of each tag in the
+        # post's unit-length tag vector (see score_posts)
+        self._post_norms: Dict[int, float] = {}
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _ensure_fresh(self, db: Session):
+        if self._built_at is None or time.monotonic() - self._built_at > self.max_age:
+            self.rebuild(db)
+
+    def rebuild(self, db: Session):
+        ServicePost = service_model.ServicePost
+        rows = db.query(service_model.Tag.name, ServicePost.id).join(
+            ServicePost.tags
+        ).filter(
+            ServicePost.status == service_model.ServiceStatus.OPEN
+        ).order_by(ServicePost.id)
+
+        postings = defaultdict(list)
+        post_tags = defaultdict(list)
+        for tag_name, post_id in rows:
+            postings[tag_name].append(post_id)
+            post_tags[post_id].append(tag_name)
+
+        with self._lock:
+            self._postings = dict(postings)
+            self._post_tags = dict(post_tags)
+            self._post_norms = {post_id: 1 / math.sqrt(len(names)) for post_id, names in post_tags.items()}
+            self._built_at = time.monotonic()
+
+    def add_post(self, post_id: int, tag_names: Iterable[str]):
+        if self._built_at is None:
+            return  # Not built yet; the first lookup will load it
+        with self._lock:
+            names = list(tag_names)
+            self._post_tags[post_id] = names
+            if names:
+                self._post_norms[post_id] = 1 / math.sqrt(len(names))
+            for name in names:
+                postings = self._postings.setdefault(name, [])
+                i = bisect.bisect_left(postings, post_id)
+                if i == len(postings) or postings[i] != post_id:
+                    postings.insert(i, post_id)
+
+    def remove_post(self, post_id: int):
+        with self._lock:
+            self._post_norms.pop(post_id, None)
+            for name in self._post_tags.pop(post_id, []):
+                postings = self._postings.get(name, [])
+                i = bisect.bisect_left(postings, post_id)
+                if i < len(postings) and postings[i] == post_id:
+                    postings.pop(i)
+
+    def posts_with_all_tags(self, db: Session, tag_names: Iterable[str]) -> List[int]:
+        """Ids of OPEN posts carrying every tag in `tag_names`, ascending."""
+        self._ensure_fresh(db)
+        with self._lock:
+            lists = [self._postings.get(name, []) for name in set(tag_names)]
+            if not lists:
+                return []
+            # Smallest list first keeps every intermediate result small
+            lists.sort(key=len)
+            result = lists[0]
+            for postings in lists[1:]:
+                if not result:
+                    break
+                result = gallop_intersect(result, postings)
+            return list(result)
+
+    def score_posts(self, db: Session, weights: Dict[str, float]) -> Dict[int, float]:
+        """
+        Dot product of a sparse tag -> weight vector with every OPEN post, each
+        post being a unit vector over its tags, so carrying many tags doesn't
+        raise a score by itself. Only the posting lists of tags in `weights` are
+        walked; posts sharing no tag with it are left out.
+        """
+        self._ensure_fresh(db)
+        with self._lock:
+            scores: Dict[int, float] = {}
+            get = scores.get
+            for name, weight in weights.items():
+                for post_id in self._postings.get(name, ()):
+                    scores[post_id] = get(post_id, 0.0) + weight
+            norms = self._post_norms
+            return {post_id: score * norms.get(post_id, 1.0) for post_id, score in scores.items()}
+
+
+tag_index = TagPostingIndex(max_age=settings.SERVICE_TAG_INDEX_MAX_AGE_SECONDS)
@@ -1,10 +1,12 @@
 # backend/app/services/user_service.py
 
-import bcrypt
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.db.bulk import get_or_create_many
 from app.models import user_model
 from app.schemas import user_schema
+from app.services.password_hasher import password_hasher
 
 # Predefined list of colleges
 ALLOWED_COLLEGES = [
@@ -18,9 +20,15 @@ ALLOWED_COLLEGES = [
 
 
 # --- ADD THIS NEW FUNCTION ---
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Checks if a plain text password matches a hashed password."""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Checks if a plain text password matches a hashed password. bcrypt runs in
+    the password hashing pool; raises a 503 when the pool is saturated.
+    """
+    # Registration never accepts these, and bcrypt refuses them outright
+    if len(plain_password.encode("utf-8")) > user_schema.MAX_PASSWORD_BYTES:
+        return False
+    return await password_hasher.verify(plain_password, hashed_password)
 
 def get_user_by_email(db: Session, email: str):
     """Fetches a user from the database by their email address."""
@@ -32,24 +40,26 @@ def get_or_create_college(db: Session, college_name: str):
     Fetches a college by name from the database.
     If it doesn't exist, it creates a new one.
     """
-    college = db.query(user_model.College).filter(user_model.College.name == college_name).first()
-    if not college:
-        college = user_model.College(name=college_name)
-        db.add(college)
-        db.commit()
-        db.refresh(college)
-    return college
+    colleges = get_or_create_many(db, user_model.College, ["name"], [{"name": college_name}])
+    db.commit()
+    return colleges[(college_name,)]
 
 
-def create_user(db: Session, user: user_schema.UserCreate):
-    """Creates a new user in the database."""
+async def create_user(db: Session, user: user_schema.UserCreate):
+    """
+    Creates a new user in the database. Awaited from the event loop: bcrypt runs
+    in the password hashing pool and the inserts in the threadpool.
+    """
     # Validate college name
     if user.college_name not in ALLOWED_COLLEGES:
         raise ValueError(f"Invalid college name. Must be one of: {', '.join(ALLOWED_COLLEGES)}")
     
-    # Hash the password using bcrypt directly
-    hashed_password = bcrypt.hashpw(user.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    # Hash the password with bcrypt, in the password hashing pool
+    hashed_password = await password_hasher.hash(user.password)
+    return await run_in_threadpool(_insert_user, db, user, hashed_password)
+
 
+def _insert_user(db: Session, user: user_schema.UserCreate, hashed_password: str):
     # Find or create the college for the user
     college = get_or_create_college(db, college_name=user.college_name)
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark for service post search: the old ILIKE '%term%' filter against the
+full-text search path (tsvector + GIN index).
+
+Seeds N posts into the database at DATABASE_URL (Postgres only), then times
+both queries for a few search terms.
+WARNING: point DATABASE_URL at a scratch database. Seeded posts are deleted
+afterwards, but it still creates tables and writes a lot of rows.
+
+Usage: python bench_service_search.py [--posts 100000] [--runs 20]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import delete, func, insert, select
+
+from app.db.database import Base, SessionLocal, engine
+from app.models import user_model, service_model
+from app.services import service_service
+
+WORDS = (
+    "cab ride airport station share trip notes lab assignment tutor physics "
+    "calculus python project hackathon design poster photography event fest "
+    "volunteer food delivery laptop repair printing resume review interview "
+    "guitar lessons gym partner moving help books exchange coding mentor"
+).split()
+SEARCHES = ["airport", "python tutor", "resume review", "guitar"]
+
+
+def sentence(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+def seed(db, posts: int, poster_id: int) -> int:
+    """Inserts `posts` open posts and fills their search vectors. Returns the first id."""
+    ServicePost = service_model.ServicePost
+    first_id = (db.query(func.max(ServicePost.id)).scalar() or 0) + 1
+    batch = []
+    for _ in range(posts):
+        batch.append({
+            "poster_user_id": poster_id,
+            "title": sentence(5).capitalize(),
+            "description": sentence(40),
+            "status": service_model.ServiceStatus.OPEN,
+            "team_size": 1,
+            "compensation_type": service_model.CompensationType.NEGOTIABLE,
+            "requires_resume": False,
+            "requires_cover_letter": False,
+            "is_anonymous": False,
+        })
+        if len(batch) == 5000:
+            db.execute(insert(ServicePost), batch)
+            batch = []
+    if batch:
+        db.execute(insert(ServicePost), batch)
+
+    db.commit()
+    service_service.backfill_search_vectors(db, batch_size=5000)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("ANALYZE service_posts")
+    return first_id
+
+
+def time_ilike(db, term: str):
+    ServicePost = service_model.ServicePost
+    pattern = f"%{term.lower()}%"
+    return db.execute(
+        select(ServicePost.id).where(
+            ServicePost.status == service_model.ServiceStatus.OPEN,
+            ServicePost.title.ilike(pattern) | ServicePost.description.ilike(pattern)
+        ).order_by(ServicePost.created_at.desc()).limit(20)
+    ).all()
+
+
+def time_fulltext(db, term: str):
+    ServicePost = service_model.ServicePost
+    tsquery = func.websearch_to_tsquery(service_model.TEXT_SEARCH_CONFIG, term)
+    return db.execute(
+        select(ServicePost.id).where(
+            ServicePost.status == service_model.ServiceStatus.OPEN,
+            ServicePost.search_vector.op('@@')(tsquery)
+        ).order_by(
+            func.ts_rank_cd(ServicePost.search_vector, tsquery).desc(), ServicePost.created_at.desc()
+        ).limit(20)
+    ).all()
+
+
+def measure(fn, db, term: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(db, term)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("This benchmark needs Postgres (full-text search is Postgres only).")
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    poster = db.query(user_model.User).first()
+    if not poster:
+        raise SystemExit("Create at least one user first.")
+
+    print(f"Seeding {args.posts} posts...")
+    first_id = seed(db, args.posts, poster.id)
+    try:
+        print(f"{'search':<16}{'ILIKE (ms)':>12}{'tsvector (ms)':>15}{'speedup':>10}")
+        for term in SEARCHES:
+            ilike_ms = measure(time_ilike, db, term, args.runs)
+            fulltext_ms = measure(time_fulltext, db, term, args.runs)
+            print(f"{term:<16}{ilike_ms:>12.2f}{fulltext_ms:>15.2f}{ilike_ms / fulltext_ms:>9.1f}x")
+    finally:
+        db.execute(delete(service_model.ServicePost).where(service_model.ServicePost.id >= first_id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
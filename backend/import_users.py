@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Bulk user import, for onboarding a whole college at once.
+
+Streams a CSV with the columns email, full_name, password, college_name and
+creates each user together with an empty profile. Passwords are hashed in
+parallel on all cores, colleges are resolved once, and users are inserted a
+batch per transaction.
+
+The import can be resumed: emails that already have an account are skipped
+(without hashing their password), so after an interruption just run the same
+command again. Progress is printed after every batch.
+
+Usage: python import_users.py users.csv [--batch-size 1000] [--workers N]
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.db.bulk import get_or_create_many
+from app.db.database import Base, SessionLocal, engine
+from app.models import user_model, profile_model
+from app.schemas import user_schema
+from app.services.password_hasher import hash_password
+from app.services.user_service import ALLOWED_COLLEGES
+
+# Attempts per batch when a concurrent signup takes one of its emails
+BATCH_ATTEMPTS = 3
+
+
+def read_users(path: str):
+    """
+    Yields (line number, UserCreate) for valid rows, and reports invalid ones on
+    stderr. UserCreate validates the same way as /register (including the
+    password length bcrypt accepts).
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                user = user_schema.UserCreate(
+                    email=(row.get("email") or "").strip(),
+                    full_name=(row.get("full_name") or "").strip(),
+                    password=row.get("password") or "",
+                    college_name=(row.get("college_name") or "").strip(),
+                )
+            except ValidationError as e:
+                print(f"Line {reader.line_num}: skipped, {e.errors()[0]['msg']}", file=sys.stderr)
+                continue
+            if not user.password:
+                print(f"Line {reader.line_num}: skipped, empty password", file=sys.stderr)
+                continue
+            if user.college_name not in ALLOWED_COLLEGES:
+                print(f"Line {reader.line_num}: skipped, unknown college {user.college_name!r}", file=sys.stderr)
+                continue
+            yield reader.line_num, user
+
+
+def batches(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_batch(db, pool: ProcessPoolExecutor, batch, colleges: dict) -> int:
+    """
+    Creates the batch's new users and their profiles in one transaction. Returns how many were created.
+
+    If someone signs up with one of the batch's emails while it is being imported,
+    the insert fails; the batch is then retried without the emails that now exist.
+    """
+    hashes = {}
+    for attempt in range(1, BATCH_ATTEMPTS + 1):
+        try:
+            return _insert_batch(db, pool, batch, colleges, hashes)
+        except IntegrityError:
+            db.rollback()
+            # Colleges created in the rolled back transaction are gone again
+            colleges.clear()
+            if attempt == BATCH_ATTEMPTS:
+                raise
+            print(f"Line {batch[-1][0]}: an email in this batch was just registered elsewhere, retrying", file=sys.stderr)
+
+
+def _insert_batch(db, pool: ProcessPoolExecutor, batch, colleges: dict, hashes: dict) -> int:
+    """One attempt at import_batch. `hashes` keeps password hashes (by email) across attempts."""
+    User = user_model.User
+
+    # Resuming: drop emails that already have an account, and repeats within the file
+    emails = {user.email for _, user in batch}
+    existing = set(db.scalars(select(User.email).where(User.email.in_(emails))))
+    new_users = {}
+    for _, user in batch:
+        if user.email not in existing:
+            new_users.setdefault(user.email, user)
+    if not new_users:
+        return 0
+
+    missing = {user.college_name for user in new_users.values()} - colleges.keys()
+    if missing:
+        found = get_or_create_many(db, user_model.College, ["name"], [{"name": name} for name in missing])
+        colleges.update({name: college.id for (name,), college in found.items()})
+
+    users = list(new_users.values())
+    unhashed = [user for user in users if user.email not in hashes]
+    hashes.update(zip(
+        (user.email for user in unhashed),
+        pool.map(hash_password, [user.password for user in unhashed], chunksize=16)
+    ))
+    rows = [
+        {
+            "email": user.email,
+            "full_name": user.full_name,
+            "hashed_password": hashes[user.email],
+            "college_id": colleges[user.college_name],
+        }
+        for user in users
+    ]
+
+    # One multi-row INSERT ... RETURNING per few hundred rows (insertmanyvalues)
+    user_ids = db.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), rows).all()
+    db.execute(insert(profile_model.Profile), [{"user_id": user_id} for user_id in user_ids])
+    db.commit()
+    return len(user_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import users from a CSV file.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="bcrypt processes (default: one per core)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    read = created = 0
+    colleges = {}
+    db = SessionLocal()
+    pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for batch in batches(read_users(args.csv_path), args.batch_size):
+            created += import_batch(db, pool, batch, colleges)
+            read += len(batch)
+            elapsed = time.perf_counter() - started
+            print(
+                f"Line {batch[-1][0]}: {read} valid rows, {created} users created, "
+                f"{read - created} skipped as existing or repeated ({created / elapsed:.0f} users/s)"
+            )
+    except KeyboardInterrupt:
+        db.rollback()
+        print("Interrupted. Completed batches are saved; run the same command again to resume.")
+        sys.exit(1)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        db.close()
+
+    print(f"✅ Import complete: {created} users created in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
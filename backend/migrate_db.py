@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Script to bring an existing database up to the current schema without
+dropping data (unlike reset_db.py):
+
+- creates missing tables, and missing indexes on existing tables;
+- adds missing columns to existing tables;
+- backfills the data that new columns derive from other tables.
+
+Safe to run more than once.
+"""
+
+from sqlalchemy import func, inspect, literal, select, sql, true, update
+from sqlalchemy.schema import CreateColumn
+
+from app.db.database import Base, SessionLocal, engine
+from app.models import (
+    user_model,
+    profile_model,
+    pooling_model,
+    message_model,
+    conversation_model,
+    service_model
+)
+from app.services import message_service, service_service
+
+# Indexes replaced by ones under a new name, dropped once the new ones exist
+SUPERSEDED_INDEXES = {
+    "conversations": ["ix_conversation_user1_last_message", "ix_conversation_user2_last_message"],
+}
+
+
+def add_missing_columns(conn):
+    """ALTER TABLE ... ADD COLUMN for model columns the database doesn't have yet."""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = str(CreateColumn(column).compile(dialect=conn.dialect))
+            # Python-side defaults have to become server defaults, or NOT NULL
+            # columns can't be added to a table that already has rows
+            if column.server_default is None and column.default is not None and column.default.is_scalar:
+                default = literal(column.default.arg, column.type).compile(
+                    dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+                )
+                ddl += f" DEFAULT {default}"
+            print(f"Adding column {table.name}.{column.name}...")
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+
+
+def backfill_read_watermarks(conn):
+    """
+    Databases from before the read watermarks kept a per-message `is_read` flag
+    instead. Raises each participant's watermark to the newest of their
+    partner's messages marked read, so history doesn't come back as unread.
+    Does nothing once `is_read` has been dropped.
+    """
+    if "is_read" not in {info["name"] for info in inspect(conn).get_columns("messages")}:
+        return
+    Conversation = conversation_model.Conversation
+    # The model no longer has is_read, so describe the old table by hand
+    messages = sql.table(
+        "messages", sql.column("id"), sql.column("conversation_id"), sql.column("sender_id"), sql.column("is_read")
+    )
+    for watermark, partner in (
+        (Conversation.user1_last_read_message_id, Conversation.user2_id),
+        (Conversation.user2_last_read_message_id, Conversation.user1_id),
+    ):
+        newest_read = select(func.max(messages.c.id)).where(
+            messages.c.conversation_id == Conversation.id,
+            messages.c.sender_id == partner,
+            messages.c.is_read == true()
+        ).scalar_subquery()
+        result = conn.execute(
+            update(Conversation)
+            .where(newest_read > watermark)
+            .values({watermark: newest_read, Conversation.updated_at: Conversation.updated_at})
+        )
+        print(f"  {result.rowcount} {watermark.key} watermarks raised")
+
+
+def migrate_database():
+    print("Creating missing tables...")
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        add_missing_columns(conn)
+        print("Creating missing indexes...")
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        inspector = inspect(conn)
+        for table_name, index_names in SUPERSEDED_INDEXES.items():
+            existing = {index["name"] for index in inspector.get_indexes(table_name)}
+            for index_name in index_names:
+                if index_name in existing:
+                    print(f"Dropping superseded index {index_name}...")
+                    conn.exec_driver_sql(f"DROP INDEX {index_name}")
+
+        print("Deriving read watermarks from is_read...")
+        backfill_read_watermarks(conn)
+
+    with SessionLocal() as db:
+        print("Recounting applications per post...")
+        posts = service_service.recount_application_counters(db)
+        db.commit()
+        print(f"  {posts} posts updated")
+
+        print("Recomputing conversation summaries and unread counts...")
+        conversations = message_service.recount_conversation_summaries(db)
+        db.commit()
+        print(f"  {conversations} conversations updated")
+
+        if db.get_bind().dialect.name == "postgresql":
+            print("Filling in missing service post search vectors...")
+            posts = service_service.backfill_search_vectors(db)
+            print(f"  {posts} posts updated")
+
+    print("✅ Database migration complete!")
+
+
+if __name__ == "__main__":
+    migrate_database()
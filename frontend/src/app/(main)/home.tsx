@@ -7,7 +7,7 @@ import { useFocusEffect, useRouter } from 'expo-router';
 // --- Local Hooks & Context ---
 import { useLocation } from '../../hooks/useLocation';
 import { useAuth } from '../../context/AuthContext';
-import { usePoolingSocket } from '../../hooks/usePoolingSocket';
+import { usePoolingSocket, ConnectionUpdate } from '../../hooks/usePoolingSocket';
 
 // --- API Service Functions & Types ---
 import {
@@ -46,7 +46,16 @@ export default function PoolingScreen() {
   const { token, user } = useAuth();
   const router = useRouter();
   const { location: liveLocation, getUserLocation } = useLocation();
-  const { match, connectionUpdate, chatMessage, connect, disconnect, clearMatch, sendWebSocketMessage } = usePoolingSocket(token);
+  const {
+    matches: newMatches,
+    connectionUpdates,
+    consumeMatches,
+    consumeConnectionUpdates,
+    connect,
+    disconnect,
+    clearMatch,
+    sendWebSocketMessage,
+  } = usePoolingSocket(token);
 
   const [isSearchModalVisible, setIsSearchModalVisible] = useState(false);
   const [screenState, setScreenState] = useState<ScreenState>('idle');
@@ -93,10 +102,13 @@ export default function PoolingScreen() {
 
   // --- Handle WebSocket connection updates ---
   useEffect(() => {
-    if (!connectionUpdate) return;
-
-    const { type, data } = connectionUpdate;
+    if (connectionUpdates.length === 0) return;
+    // Several updates can arrive in one frame; handle them all, in order
+    connectionUpdates.forEach(handleConnectionUpdate);
+    consumeConnectionUpdates(connectionUpdates.length);
+  }, [connectionUpdates, token]);
 
+  const handleConnectionUpdate = ({ type, data }: ConnectionUpdate) => {
     if (type === 'request_sent') {
       console.log('Request sent successfully:', data);
       // Update the match to show pending_sent status
@@ -174,7 +186,7 @@ export default function PoolingScreen() {
         handleNewSearch();
       }
     }
-  }, [connectionUpdate, token]);
+  };
 
   // --- Map and Location Logic ---
 
@@ -479,18 +491,19 @@ export default function PoolingScreen() {
   // The component doesn't need to reset on focus since we're staying on the same tab
 
   useEffect(() => {
-    if (match) {
-      setMatches(prevMatches => {
-        const isAlreadyMatched = prevMatches.some(prevMatch => prevMatch.id === match.id);
-        if (isAlreadyMatched) {
-          return prevMatches;
-        }
-        return [...prevMatches, match];
-      });
-      setScreenState('results');
-      // Keep WebSocket connected for real-time notifications
-    }
-  }, [match]);
+    if (newMatches.length === 0) return;
+    setMatches(prevMatches => {
+      const added = newMatches.filter(
+        (match, index) =>
+          !prevMatches.some(prevMatch => prevMatch.id === match.id) &&
+          newMatches.findIndex(other => other.id === match.id) === index
+      );
+      return added.length > 0 ? [...prevMatches, ...added] : prevMatches;
+    });
+    consumeMatches(newMatches.length);
+    setScreenState('results');
+    // Keep WebSocket connected for real-time notifications
+  }, [newMatches]);
 
   // --- RENDER ---
   
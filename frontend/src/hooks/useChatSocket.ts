@@ -14,7 +14,10 @@ interface ChatMessage {
 
 interface UseChatSocketReturn {
   isConnected: boolean;
-  chatMessage: ChatMessage | null;
+  // Received messages not yet consumed, oldest first
+  chatMessages: ChatMessage[];
+  // Call after handling the first `count` entries of chatMessages
+  consumeChatMessages: (count: number) => void;
   sendChatMessage: (receiverId: number, connectionId: number, content: string, messageId?: number) => void;
   connect: (token: string) => void;
   disconnect: () => void;
@@ -22,9 +25,15 @@ interface UseChatSocketReturn {
 
 export const useChatSocket = (): UseChatSocketReturn => {
   const [isConnected, setIsConnected] = useState(false);
-  const [chatMessage, setChatMessage] = useState<ChatMessage | null>(null);
+  // A queue rather than a single value: React batches state updates, so one
+  // value per event would lose all but the last event of a multi-event frame
+  const [chatMessages, setChatMessages] = useState<ChatMessage[]>([]);
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  // The last event sequence number we received, sent back on reconnect
+  const lastSeqRef = useRef<number | null>(null);
+  // The server log that numbered it; seqs are only comparable within one log
+  const logIdRef = useRef<string | null>(null);
 
   const connect = useCallback((token: string) => {
     if (wsRef.current?.readyState === WebSocket.OPEN) {
@@ -33,7 +42,10 @@ export const useChatSocket = (): UseChatSocketReturn => {
     }
 
     try {
-      const ws = new WebSocket(`${WS_BASE_URL}/ws/chat?token=${token}`);
+      const resumeParam = lastSeqRef.current !== null
+        ? `&last_seq=${lastSeqRef.current}&log_id=${logIdRef.current ?? ''}`
+        : '';
+      const ws = new WebSocket(`${WS_BASE_URL}/ws/chat?token=${token}${resumeParam}`);
 
       ws.onopen = () => {
         console.log('Chat WebSocket connected');
@@ -42,18 +54,34 @@ export const useChatSocket = (): UseChatSocketReturn => {
 
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
-          console.log('Chat WebSocket message received:', data);
-
-          if (data.type === 'chat_message') {
-            setChatMessage({
-              type: data.type,
-              message_id: data.message_id,
-              connection_id: data.connection_id,
-              sender_id: data.sender_id,
-              content: data.content,
-              created_at: data.created_at,
-            });
+          const parsed = JSON.parse(event.data);
+          console.log('Chat WebSocket message received:', parsed);
+
+          // The server may coalesce several events into a single array frame.
+          const frames = Array.isArray(parsed) ? parsed : [parsed];
+          const received: ChatMessage[] = [];
+          for (const data of frames) {
+            if (data.seq !== undefined) {
+              lastSeqRef.current = data.seq;
+              logIdRef.current = data.log_id ?? null;
+            }
+
+            if (data.type === 'ping') {
+              // Server heartbeat - answer so the connection isn't reaped
+              ws.send(JSON.stringify({ type: 'pong' }));
+            } else if (data.type === 'chat_message') {
+              received.push({
+                type: data.type,
+                message_id: data.message_id,
+                connection_id: data.connection_id,
+                sender_id: data.sender_id,
+                content: data.content,
+                created_at: data.created_at,
+              });
+            }
+          }
+          if (received.length > 0) {
+            setChatMessages(prev => [...prev, ...received]);
           }
         } catch (error) {
           console.error('Error parsing chat WebSocket message:', error);
@@ -116,6 +144,10 @@ export const useChatSocket = (): UseChatSocketReturn => {
     []
   );
 
+  const consumeChatMessages = useCallback((count: number) => {
+    setChatMessages(prev => prev.slice(count));
+  }, []);
+
   useEffect(() => {
     return () => {
       disconnect();
@@ -124,7 +156,8 @@ export const useChatSocket = (): UseChatSocketReturn => {
 
   return {
     isConnected,
-    chatMessage,
+    chatMessages,
+    consumeChatMessages,
     sendChatMessage,
     connect,
     disconnect,
@@ -7,7 +7,7 @@ import { Alert } from 'react-native';
 
 // Define the shape of messages we expect from the server
 interface WebSocketMessage {
-  type: 'match_found' | 'connection_request_received' | 'connection_request_sent' | 'connection_approved' | 'connection_rejected' | 'ride_cancelled' | 'chat_message';
+  type: 'match_found' | 'connection_request_received' | 'connection_request_sent' | 'connection_approved' | 'connection_rejected' | 'ride_cancelled' | 'chat_message' | 'ping';
   match?: MatchedUser;
   connection_id?: number;
   from_user?: Partial<MatchedUser>;
@@ -20,18 +20,35 @@ interface WebSocketMessage {
   sender_name?: string;
   content?: string;
   created_at?: string;
+  // Event sequence number, used to replay missed events on reconnect
+  seq?: number;
+  // The server log that numbered `seq`
+  log_id?: string;
+}
+
+export interface ConnectionUpdate {
+  type: string;
+  data: any;
 }
 
 export function usePoolingSocket(token: string | null) {
   const [isConnected, setIsConnected] = useState(false);
-  const [match, setMatch] = useState<MatchedUser | null>(null);
   const [error, setError] = useState<string | null>(null);
-  const [connectionUpdate, setConnectionUpdate] = useState<{ type: string; data: any } | null>(null);
-  const [chatMessage, setChatMessage] = useState<WebSocketMessage | null>(null);
+  // Events not yet handled by the screen, oldest first. These are queues rather
+  // than single values because React batches state updates: one value per
+  // event would lose all but the last event of a multi-event frame. Consumers
+  // handle the entries and then call the matching consume function.
+  const [matches, setMatches] = useState<MatchedUser[]>([]);
+  const [connectionUpdates, setConnectionUpdates] = useState<ConnectionUpdate[]>([]);
+  const [chatMessages, setChatMessages] = useState<WebSocketMessage[]>([]);
   
   // useRef is used to hold a reference to the WebSocket object itself.
   // This prevents it from being recreated on every component re-render.
   const socketRef = useRef<WebSocket | null>(null);
+  // The last event sequence number we received, sent back on reconnect
+  const lastSeqRef = useRef<number | null>(null);
+  // The server log that numbered it; seqs are only comparable within one log
+  const logIdRef = useRef<string | null>(null);
 
   // This function will be called by our UI to start the connection
   const connect = () => {
@@ -45,7 +62,10 @@ export function usePoolingSocket(token: string | null) {
     }
 
     // Convert the http:// URL to a ws:// URL
-    const wsUrl = API_BASE_URL.replace(/^http/, 'ws').replace('/api', '/api/ws/pool');
+    let wsUrl = API_BASE_URL.replace(/^http/, 'ws').replace('/api', '/api/ws/pool');
+    if (lastSeqRef.current !== null) {
+      wsUrl += `?last_seq=${lastSeqRef.current}&log_id=${logIdRef.current ?? ''}`;
+    }
     console.log('Connecting to WebSocket:', wsUrl);
 
     // --- Create the WebSocket connection ---
@@ -62,67 +82,88 @@ export function usePoolingSocket(token: string | null) {
     ws.onmessage = (event) => {
       console.log('Received message from server:', event.data);
       try {
-        const message: WebSocketMessage = JSON.parse(event.data);
-        
-        switch (message.type) {
-          case 'match_found':
-            if (message.match) {
-              setMatch(message.match); // A match has been found!
-            }
-            break;
+        const parsed = JSON.parse(event.data);
+        // The server may coalesce several events into a single array frame.
+        const messages: WebSocketMessage[] = Array.isArray(parsed) ? parsed : [parsed];
+        const newMatches: MatchedUser[] = [];
+        const updates: ConnectionUpdate[] = [];
+        const chats: WebSocketMessage[] = [];
+
+        for (const message of messages) {
+          if (message.seq !== undefined) {
+            lastSeqRef.current = message.seq;
+            logIdRef.current = message.log_id ?? null;
+          }
+
+          switch (message.type) {
+            case 'match_found':
+              if (message.match) {
+                newMatches.push(message.match); // A match has been found!
+              }
+              break;
             
-          case 'connection_request_sent':
-            // We sent a request successfully - update UI
-            console.log('Request sent notification:', message);
-            setConnectionUpdate({ type: 'request_sent', data: message });
-            break;
+            case 'connection_request_sent':
+              // We sent a request successfully - update UI
+              console.log('Request sent notification:', message);
+              updates.push({ type: 'request_sent', data: message });
+              break;
             
-          case 'connection_request_received':
-            // Someone sent us a connection request
-            Alert.alert(
-              '🚗 Connection Request',
-              `${message.from_user?.full_name} wants to pool with you!`,
-              [{ text: 'View' }]
-            );
-            setConnectionUpdate({ type: 'request_received', data: message });
-            break;
+            case 'connection_request_received':
+              // Someone sent us a connection request
+              Alert.alert(
+                '🚗 Connection Request',
+                `${message.from_user?.full_name} wants to pool with you!`,
+                [{ text: 'View' }]
+              );
+              updates.push({ type: 'request_received', data: message });
+              break;
             
-          case 'connection_approved':
-            // Connection approved - both users get partner details
-            Alert.alert(
-              '✅ Connection Approved!',
-              `You are now connected with ${message.partner?.full_name}. You can start your ride!`,
-              [{ text: 'Great!' }]
-            );
-            setConnectionUpdate({ type: 'approved', data: message });
-            break;
+            case 'connection_approved':
+              // Connection approved - both users get partner details
+              Alert.alert(
+                '✅ Connection Approved!',
+                `You are now connected with ${message.partner?.full_name}. You can start your ride!`,
+                [{ text: 'Great!' }]
+              );
+              updates.push({ type: 'approved', data: message });
+              break;
             
-          case 'connection_rejected':
-            // Our request was rejected
-            Alert.alert(
-              'Request Declined',
-              `${message.by_user?.full_name} declined your connection request.`,
-              [{ text: 'OK' }]
-            );
-            setConnectionUpdate({ type: 'rejected', data: message });
-            break;
+            case 'connection_rejected':
+              // Our request was rejected
+              Alert.alert(
+                'Request Declined',
+                `${message.by_user?.full_name} declined your connection request.`,
+                [{ text: 'OK' }]
+              );
+              updates.push({ type: 'rejected', data: message });
+              break;
             
-          case 'ride_cancelled':
-            // Partner cancelled the ride
-            Alert.alert(
-              'Ride Cancelled',
-              message.message || 'Your pooling partner cancelled the ride.',
-              [{ text: 'OK' }]
-            );
-            setConnectionUpdate({ type: 'cancelled', data: message });
-            break;
+            case 'ride_cancelled':
+              // Partner cancelled the ride
+              Alert.alert(
+                'Ride Cancelled',
+                message.message || 'Your pooling partner cancelled the ride.',
+                [{ text: 'OK' }]
+              );
+              updates.push({ type: 'cancelled', data: message });
+              break;
             
-          case 'chat_message':
-            // Received a chat message
-            console.log('Chat message received:', message);
-            setChatMessage(message);
-            break;
+            case 'chat_message':
+              // Received a chat message
+              console.log('Chat message received:', message);
+              chats.push(message);
+              break;
+
+            case 'ping':
+              // Server heartbeat - answer so the connection isn't reaped
+              ws.send(JSON.stringify({ type: 'pong' }));
+              break;
+          }
         }
+
+        if (newMatches.length > 0) setMatches(prev => [...prev, ...newMatches]);
+        if (updates.length > 0) setConnectionUpdates(prev => [...prev, ...updates]);
+        if (chats.length > 0) setChatMessages(prev => [...prev, ...chats]);
       } catch (e) {
         console.error('Failed to parse WebSocket message:', e);
       }
@@ -148,9 +189,20 @@ export function usePoolingSocket(token: string | null) {
     }
   };
 
-  // This function clears the match state
+  // These drop the first `count` entries of a queue once they are handled
+  const consumeMatches = (count: number) => {
+    setMatches(prev => prev.slice(count));
+  };
+  const consumeConnectionUpdates = (count: number) => {
+    setConnectionUpdates(prev => prev.slice(count));
+  };
+  const consumeChatMessages = (count: number) => {
+    setChatMessages(prev => prev.slice(count));
+  };
+
+  // This function clears any matches not yet handled
   const clearMatch = () => {
-    setMatch(null);
+    setMatches([]);
   };
 
   // Send a message through WebSocket
@@ -172,10 +224,13 @@ export function usePoolingSocket(token: string | null) {
 
   return { 
     isConnected, 
-    match, 
+    matches, 
     error, 
-    connectionUpdate, 
-    chatMessage,
+    connectionUpdates, 
+    chatMessages,
+    consumeMatches,
+    consumeConnectionUpdates,
+    consumeChatMessages,
     connect, 
     disconnect, 
     clearMatch,